@@ -9,6 +9,7 @@ class AIController:
         """
         self.player = player
         self.board = board
+        self.went_first = None  # Whether the AI won the coin toss, while the first round lasts
 
     def decide_action(self, opponent_score):
         """
@@ -55,6 +56,29 @@ class AIController:
         else:
             print("AI cannot use leader ability.")
 
+    def redraw(self):
+        """
+        Replace the cards of the opening hand that the mulligan tables advise against keeping.
+        :return: List of the replaced cards.
+        """
+        indices, _ = self.player.deck.mulligan_tables.best_redraw(self.player.hand)
+        replaced = [self.player.hand[index] for index in indices]
+        for card in replaced:
+            self.player.hand.remove(card)
+            self.player.hand.extend(self.player.deck.draw(1))
+        return replaced
+
+    def begin_pondering(self):
+        """
+        Called when the opponent starts thinking about a move; controllers may think ahead meanwhile.
+        """
+
+    def end_pondering(self, card):
+        """
+        Called once the opponent has moved.
+        :param card: The card the opponent played (Card object), or None for a pass.
+        """
+
     def play_turn(self, opponent_score):
         """
         Execute the AI's turn based on its decision.
@@ -0,0 +1,239 @@
+import json
+import os
+from collections import Counter
+from multiprocessing import Pool
+from bitboard import MEDIC_MASK, SCORCH_MASK, SPY_MASK
+from card import all_cards
+from records import FACTIONS, NO_CARD, Shard, list_shards
+
+# Reported abilities and the cards the simulator resolves them for. Variants
+# such as Scorch Close and Hero Medic play as plain units there, so they are
+# left out rather than reported under an effect that never happened.
+TRACKED_ABILITIES = {"spy": SPY_MASK, "medic": MEDIC_MASK, "scorch": SCORCH_MASK}
+
+
+def tracked_ability(card):
+    """
+    Name the tracked ability the simulator resolves for a card.
+    :param card: Card id.
+    :return: A TRACKED_ABILITIES key, or None.
+    """
+    for ability, mask in TRACKED_ABILITIES.items():
+        if mask >> card & 1:
+            return ability
+    return None
+
+
+class CardStats:
+    def __init__(self):
+        """
+        Running per-card aggregates, keyed by (faction index, card id).
+
+        Memory is bounded by the number of factions times the number of
+        cards, no matter how many games are added.
+        """
+        self.games = Counter()  # Games played by each faction
+        self.in_deck = Counter()  # Games the card was in the faction's decklist
+        self.games_played = Counter()  # Games the card was played at least once
+        self.wins_when_played = Counter()
+        self.plays = Counter()
+        self.score_sum = Counter()  # Change in own score on the turns the card was played
+        self.swing_sum = Counter()  # Own score change minus opponent score change
+        self.watermarks = {}  # Shard name -> number of games already counted
+
+    def add_shard(self, shard, start=0):
+        """
+        Add the games of a shard to the aggregates in a single pass.
+        :param shard: An open Shard.
+        :param start: Index of the first game not yet counted.
+        """
+        player_factions = shard.column("games", "player_faction")
+        ai_factions = shard.column("games", "ai_faction")
+        winners = shard.column("games", "winner")
+        rounds = shard.column("turns", "round")
+        sides = shard.column("turns", "side")
+        cards = shard.column("turns", "card")
+        player_scores = shard.column("turns", "player_score")
+        ai_scores = shard.column("turns", "ai_score")
+
+        for game in range(start, len(shard)):
+            factions = (player_factions[game], ai_factions[game])
+            for side, decklist in enumerate(shard.decklists(game)):
+                self.games[factions[side]] += 1
+                for card in set(decklist):
+                    self.in_deck[(factions[side], card)] += 1
+
+            played = (set(), set())
+            current_round = None
+            before = (0, 0)
+            turn_start, turn_end = shard.span("turns", game)
+            for turn in range(turn_start, turn_end):
+                if rounds[turn] != current_round:
+                    current_round = rounds[turn]
+                    before = (0, 0)
+                after = (player_scores[turn], ai_scores[turn])
+                side, card = sides[turn], cards[turn]
+                if card != NO_CARD:
+                    key = (factions[side], card)
+                    gain = after[side] - before[side]
+                    self.plays[key] += 1
+                    self.score_sum[key] += gain
+                    self.swing_sum[key] += gain - (after[1 - side] - before[1 - side])
+                    played[side].add(card)
+                before = after
+
+            for side in (0, 1):
+                for card in played[side]:
+                    self.games_played[(factions[side], card)] += 1
+                    if winners[game] == side:
+                        self.wins_when_played[(factions[side], card)] += 1
+
+        name = os.path.basename(shard.path)
+        self.watermarks[name] = max(self.watermarks.get(name, 0), len(shard))
+
+    def merge(self, other):
+        """
+        Fold the aggregates of another CardStats into this one.
+        :param other: CardStats computed over a disjoint set of games.
+        """
+        for field in ("games", "in_deck", "games_played", "wins_when_played", "plays", "score_sum", "swing_sum"):
+            getattr(self, field).update(getattr(other, field))
+        for name, count in other.watermarks.items():
+            self.watermarks[name] = max(self.watermarks.get(name, 0), count)
+
+    def card_report(self):
+        """
+        Summarize the aggregates per faction and card.
+        :return: List of dictionaries, one per (faction, card) that appeared in a decklist.
+        """
+        report = []
+        for (faction, card), in_deck in sorted(self.in_deck.items()):
+            key = (faction, card)
+            plays = self.plays[key]
+            games_played = self.games_played[key]
+            report.append({
+                "faction": FACTIONS[faction],
+                "card": all_cards[card].name,
+                "play_rate": games_played / in_deck,
+                "win_rate_when_played": self.wins_when_played[key] / games_played if games_played else None,
+                "avg_score_contribution": self.score_sum[key] / plays if plays else None,
+                "avg_swing": self.swing_sum[key] / plays if plays else None,
+                "plays": plays,
+            })
+        return report
+
+    def ability_report(self):
+        """
+        Summarize Spy, Medic and Scorch effectiveness per faction.
+
+        Only cards whose ability the simulator resolves are counted (see
+        TRACKED_ABILITIES), so a faction without such a card has no entry.
+
+        :return: Dictionary of faction name -> ability -> aggregate figures.
+        """
+        totals = {}
+        for (faction, card), plays in self.plays.items():
+            ability = tracked_ability(card)
+            if ability is None:
+                continue
+            entry = totals.setdefault(FACTIONS[faction], {}).setdefault(
+                ability, {"plays": 0, "score_sum": 0, "swing_sum": 0, "games_played": 0, "wins": 0})
+            entry["plays"] += plays
+            entry["score_sum"] += self.score_sum[(faction, card)]
+            entry["swing_sum"] += self.swing_sum[(faction, card)]
+            entry["games_played"] += self.games_played[(faction, card)]
+            entry["wins"] += self.wins_when_played[(faction, card)]
+
+        report = {}
+        for faction, abilities in totals.items():
+            for ability, entry in abilities.items():
+                report.setdefault(faction, {})[ability] = {
+                    "plays": entry["plays"],
+                    "avg_score_contribution": entry["score_sum"] / entry["plays"],
+                    "avg_swing": entry["swing_sum"] / entry["plays"],
+                    "win_rate_when_played": entry["wins"] / entry["games_played"] if entry["games_played"] else None,
+                }
+        return report
+
+    def save(self, path):
+        """
+        Save the aggregates so a later run can continue incrementally.
+        :param path: Path of the JSON file to write.
+        """
+        data = {"watermarks": self.watermarks, "games": {str(key): value for key, value in self.games.items()}}
+        for field in ("in_deck", "games_played", "wins_when_played", "plays", "score_sum", "swing_sum"):
+            data[field] = {f"{faction}:{card}": value for (faction, card), value in getattr(self, field).items()}
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as stats_file:
+            json.dump(data, stats_file)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load aggregates written by save.
+        :param path: Path of the JSON file.
+        :return: CardStats, or an empty CardStats if the file does not exist.
+        """
+        stats = cls()
+        if not os.path.exists(path):
+            return stats
+        with open(path) as stats_file:
+            data = json.load(stats_file)
+        stats.watermarks = data["watermarks"]
+        stats.games = Counter({int(key): value for key, value in data["games"].items()})
+        for field in ("in_deck", "games_played", "wins_when_played", "plays", "score_sum", "swing_sum"):
+            counter = getattr(stats, field)
+            for key, value in data[field].items():
+                faction, card = key.split(":")
+                counter[(int(faction), int(card))] = value
+        return stats
+
+
+def _shard_stats(task):
+    """Worker entry point: aggregate the uncounted games of one shard."""
+    path, start = task
+    stats = CardStats()
+    with Shard(path) as shard:
+        stats.add_shard(shard, start)
+    return stats
+
+
+def update_stats(root, stats=None, processes=None):
+    """
+    Bring card statistics up to date with a dataset.
+
+    Only games added since the stats were last updated are scanned, and the
+    shards are processed in parallel worker processes.
+
+    :param root: Dataset directory written by RecordWriter.
+    :param stats: Existing CardStats to extend (a new one is created if None).
+    :param processes: Number of worker processes (defaults to the CPU count; 1 runs in-process).
+    :return: The updated CardStats.
+    """
+    if stats is None:
+        stats = CardStats()
+    tasks = [(os.path.join(root, name), stats.watermarks.get(name, 0)) for name in list_shards(root)]
+
+    if processes == 1 or len(tasks) <= 1:
+        for task in tasks:
+            stats.merge(_shard_stats(task))
+        return stats
+
+    with Pool(processes) as pool:
+        for partial in pool.imap_unordered(_shard_stats, tasks):
+            stats.merge(partial)
+    return stats
+
+
+if __name__ == "__main__":
+    import sys
+
+    dataset = sys.argv[1]
+    stats_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(dataset, "card_stats.json")
+    card_stats = update_stats(dataset, CardStats.load(stats_path))
+    card_stats.save(stats_path)
+
+    for row in card_stats.card_report():
+        print(f"{row['faction']:<20} {row['card']:<32} play {row['play_rate']:.2%}  plays {row['plays']}")
+    print(json.dumps(card_stats.ability_report(), indent=2))
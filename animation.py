@@ -0,0 +1,270 @@
+import pygame
+
+LOGIC_STEP = 1 / 120  # Fixed simulation step in seconds
+MAX_STEPS_PER_FRAME = 8  # Stop catching up after a long stall instead of spiralling
+
+
+def lerp(start, end, t):
+    """Linear interpolation between two numbers."""
+    return start + (end - start) * t
+
+
+def ease_out(t):
+    """Quadratic ease-out curve on [0, 1]."""
+    return 1 - (1 - t) * (1 - t)
+
+
+class Animation:
+    def __init__(self, duration):
+        """
+        Base class for animations advanced in fixed time steps.
+
+        Subclasses draw themselves from a progress value that is interpolated
+        between the last two logic steps, so motion stays smooth at any
+        display rate.
+
+        :param duration: Length of the animation in seconds.
+        """
+        self.duration = duration
+        self.elapsed = 0.0
+        self.previous_elapsed = 0.0
+        self.hidden_card = None  # Card the board should not draw while this runs
+
+    def step(self, dt):
+        """
+        Advance the animation by one fixed step.
+        :param dt: Step length in seconds.
+        """
+        self.previous_elapsed = self.elapsed
+        self.elapsed = min(self.elapsed + dt, self.duration)
+
+    def progress(self, alpha):
+        """
+        Get the interpolated progress of the animation.
+        :param alpha: Fraction of a step elapsed since the last logic step.
+        :return: Progress on [0, 1].
+        """
+        if self.duration <= 0:
+            return 1.0
+        return lerp(self.previous_elapsed, self.elapsed, alpha) / self.duration
+
+    @property
+    def done(self):
+        return self.elapsed >= self.duration
+
+    def draw(self, gui, alpha):
+        """
+        Draw the animation.
+        :param gui: The GUI to draw with.
+        :param alpha: Fraction of a step elapsed since the last logic step.
+        """
+        raise NotImplementedError
+
+
+class CardMove(Animation):
+    def __init__(self, card, start, end, duration=0.35):
+        """
+        Slide a card from one position to another.
+        :param card: The Card object being moved.
+        :param start: (x, y) start position.
+        :param end: (x, y) end position.
+        :param duration: Length of the move in seconds.
+        """
+        super().__init__(duration)
+        self.card = card
+        self.start = start
+        self.end = end
+        self.hidden_card = card
+
+    def draw(self, gui, alpha):
+        t = ease_out(self.progress(alpha))
+        gui.draw_card(self.card, lerp(self.start[0], self.end[0], t), lerp(self.start[1], self.end[1], t))
+
+
+class ScorchRemoval(Animation):
+    def __init__(self, card, position, duration=0.6):
+        """
+        Burn a card away where it used to stand.
+        :param card: The scorched Card object.
+        :param position: (x, y) position of the card.
+        :param duration: Length of the effect in seconds.
+        """
+        super().__init__(duration)
+        self.card = card
+        self.position = position
+
+    def draw(self, gui, alpha):
+        t = self.progress(alpha)
+        x, y = self.position
+        gui.draw_card(self.card, x, y)
+        burn = pygame.Surface(gui.layout.card_size, pygame.SRCALPHA)
+        burn.fill((255, 80, 0, int(lerp(80, 255, t))))
+        gui.screen.blit(burn, (x, y))
+
+
+class WeatherOverlay(Animation):
+    def __init__(self, rect, duration=0.8):
+        """
+        Fade a weather tint in and out over a row.
+        :param rect: (x, y, width, height) of the tinted area.
+        :param duration: Length of the fade in seconds.
+        """
+        super().__init__(duration)
+        self.rect = pygame.Rect(rect)
+
+    def draw(self, gui, alpha):
+        t = self.progress(alpha)
+        tint = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        tint.fill((120, 160, 255, int(lerp(0, 110, t) if t < 0.5 else lerp(110, 0, (t - 0.5) * 2))))
+        gui.screen.blit(tint, self.rect.topleft)
+
+
+class Notification(Animation):
+    def __init__(self, message, position, duration=2.0):
+        """
+        Show a message that fades out at the end of its lifetime.
+        :param message: Text to show.
+        :param position: (x, y) position of the text.
+        :param duration: How long the message stays, in seconds.
+        """
+        super().__init__(duration)
+        self.message = message
+        self.position = position
+
+    def draw(self, gui, alpha):
+        t = self.progress(alpha)
+        text_surface = gui.font.render(self.message, True, (255, 0, 0))
+        if t > 0.75:
+            text_surface.set_alpha(int(lerp(255, 0, (t - 0.75) * 4)))
+        gui.screen.blit(text_surface, self.position)
+
+
+class ScoreCounter:
+    def __init__(self, rate=40.0):
+        """
+        A displayed score that counts toward its target value.
+        :param rate: Points per second the display moves by (at least).
+        """
+        self.rate = rate
+        self.target = 0
+        self.value = 0.0
+        self.previous_value = 0.0
+
+    def step(self, dt):
+        self.previous_value = self.value
+        gap = self.target - self.value
+        delta = max(self.rate, abs(gap) * 4) * dt
+        self.value = self.target if abs(gap) <= delta else self.value + (delta if gap > 0 else -delta)
+
+    def display(self, alpha):
+        """
+        Get the score to show this frame.
+        :param alpha: Fraction of a step elapsed since the last logic step.
+        :return: Rounded, interpolated score.
+        """
+        return round(lerp(self.previous_value, self.value, alpha))
+
+
+class Animator:
+    def __init__(self, step=LOGIC_STEP):
+        """
+        Fixed-timestep scheduler for animations.
+
+        Frame time is accumulated and animations are advanced in whole logic
+        steps; the remainder becomes the interpolation factor used when drawing.
+
+        :param step: Logic step length in seconds.
+        """
+        self.step = step
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.animations = []
+        self.counters = []
+
+    def add(self, animation):
+        """
+        Start an animation.
+        :param animation: The Animation to run.
+        """
+        self.animations.append(animation)
+
+    def advance(self, frame_time):
+        """
+        Advance all animations by the time since the last frame.
+        :param frame_time: Seconds since the previous frame.
+        """
+        self.accumulator += frame_time
+        steps = 0
+        while self.accumulator >= self.step and steps < MAX_STEPS_PER_FRAME:
+            for animation in self.animations:
+                animation.step(self.step)
+            for counter in self.counters:
+                counter.step(self.step)
+            self.accumulator -= self.step
+            steps += 1
+        if steps == MAX_STEPS_PER_FRAME:
+            self.accumulator = min(self.accumulator, self.step)
+        self.alpha = self.accumulator / self.step
+        self.animations = [animation for animation in self.animations if not animation.done]
+
+    def draw(self, gui):
+        """
+        Draw all running animations.
+        :param gui: The GUI to draw with.
+        """
+        for animation in self.animations:
+            animation.draw(gui, self.alpha)
+
+    def hidden_cards(self):
+        """
+        Get the ids of cards currently drawn by an animation instead of the board.
+        :return: Set of card object ids.
+        """
+        return {id(animation.hidden_card) for animation in self.animations if animation.hidden_card is not None}
+
+    @property
+    def busy(self):
+        return bool(self.animations)
+
+
+class FrameStats:
+    def __init__(self, target_fps=60, window=600):
+        """
+        Rolling frame-time statistics.
+        :param target_fps: Display rate the renderer aims for.
+        :param window: Number of recent frames kept for percentiles.
+        """
+        self.budget = 1 / target_fps
+        self.window = window
+        self.frame_times = []
+        self.frames = 0
+        self.dropped_frames = 0
+
+    def record(self, frame_time):
+        """
+        Record the duration of one frame.
+        :param frame_time: Seconds the frame took.
+        """
+        self.frames += 1
+        # A frame that overran by half a budget means the display showed a stale image
+        if frame_time > self.budget * 1.5:
+            self.dropped_frames += int(frame_time / self.budget) - 1 or 1
+        self.frame_times.append(frame_time)
+        if len(self.frame_times) > self.window:
+            del self.frame_times[0]
+
+    def report(self):
+        """
+        Summarize recent frame times.
+        :return: Dictionary with frame counts and frame times in milliseconds.
+        """
+        if not self.frame_times:
+            return {"frames": 0, "dropped_frames": 0}
+        ordered = sorted(self.frame_times)
+        return {
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "mean_ms": sum(ordered) / len(ordered) * 1000,
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            "max_ms": ordered[-1] * 1000,
+        }
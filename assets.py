@@ -0,0 +1,63 @@
+from collections import OrderedDict
+import pygame
+
+
+class AssetCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Least-recently-used cache of card art scaled to the sizes being drawn.
+
+        Each image is scaled once per target size; when the display is resized
+        the old sizes simply age out, and the total pixel memory of the
+        cached surfaces never exceeds max_bytes.
+
+        :param max_bytes: Upper bound on the memory of cached surfaces.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (path, size) -> Surface
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def scaled(self, path, image, size):
+        """
+        Get an image scaled to a size, scaling it only on the first request.
+        :param path: Path the image was loaded from (the cache key).
+        :param image: The decoded, unscaled Surface.
+        :param size: (width, height) to scale to.
+        :return: Scaled Surface.
+        """
+        key = (path, size)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        try:
+            surface = pygame.transform.smoothscale(image, size)
+        except ValueError:
+            # smoothscale only handles 24 and 32 bit surfaces
+            surface = pygame.transform.scale(image, size)
+        self.entries[key] = surface
+        self.bytes += _surface_bytes(surface)
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= _surface_bytes(evicted)
+        return surface
+
+    def clear(self):
+        """
+        Drop every cached surface.
+        """
+        self.entries.clear()
+        self.bytes = 0
+
+
+def _surface_bytes(surface):
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
+
+
+default_cache = AssetCache()
@@ -0,0 +1,343 @@
+from card import all_cards, card_id
+
+ROW_NAMES = ["close", "ranged", "siege"]
+SIDES = ["player", "ai"]
+NUM_CARDS = len(all_cards)
+ALL_MASK = (1 << NUM_CARDS) - 1
+
+# Fixed-width encodings (search.encode_state, spectator hand events) store a
+# mask as two signed 64-bit words of MASK_WORD_BITS bits each
+MASK_WORD_BITS = 63
+MAX_CARDS = 2 * MASK_WORD_BITS
+assert NUM_CARDS <= MAX_CARDS, f"card.py defines {NUM_CARDS} cards; masks are encoded for at most {MAX_CARDS}"
+
+
+def bit(card):
+    """Return the single-bit mask of a Card object."""
+    return 1 << card_id(card)
+
+
+def ids_of(mask):
+    """
+    Iterate the card ids set in a mask, lowest first.
+    :param mask: Integer bitmask over card ids.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_of(cards):
+    """
+    Build a mask from Card objects.
+    :param cards: Iterable of Card objects.
+    :return: Integer bitmask over card ids.
+    """
+    mask = 0
+    for card in cards:
+        mask |= 1 << card_id(card)
+    return mask
+
+
+# Per-id tables built once from card.py
+STRENGTH = [card.strength or 0 for card in all_cards]
+ROW_OF = [ROW_NAMES.index(card.row) if card.row in ROW_NAMES else -1 for card in all_cards]
+ABILITY = [(card.ability or "").lower() for card in all_cards]
+
+
+def _mask_where(predicate):
+    return sum(1 << index for index, card in enumerate(all_cards) if predicate(index, card))
+
+
+UNIT_MASK = _mask_where(lambda index, card: card.strength is not None)
+PLACEABLE_MASK = _mask_where(lambda index, card: ROW_OF[index] >= 0)
+ROW_MASKS = [_mask_where(lambda index, card, row=row: ROW_OF[index] == row) for row in range(len(ROW_NAMES))]
+HERO_MASK = _mask_where(lambda index, card: ABILITY[index].startswith("hero"))
+SPY_MASK = _mask_where(lambda index, card: ABILITY[index] == "spy")
+MEDIC_MASK = _mask_where(lambda index, card: ABILITY[index] == "medic")
+SCORCH_MASK = _mask_where(lambda index, card: ABILITY[index] == "scorch")
+WEATHER_MASK = _mask_where(lambda index, card: ABILITY[index] in ("frost", "fog", "rain"))
+HORN_MASK = _mask_where(lambda index, card: ABILITY[index] == "horn")
+CLEAR_MASK = _mask_where(lambda index, card: ABILITY[index] == "clear")
+SPECIAL_MASK = _mask_where(lambda index, card: card.deck_type == "special")
+TIGHT_BOND_MASK = _mask_where(lambda index, card: ABILITY[index] == "tight bond")
+
+# Tight Bond cards bond with copies of the same card. card.py defines each
+# card once and a mask holds an id at most once, so every group is a single
+# bit today; copies need their own ids before these counts can exceed 1.
+BOND_GROUPS = {}
+for _index in ids_of(TIGHT_BOND_MASK):
+    BOND_GROUPS[all_cards[_index].name] = BOND_GROUPS.get(all_cards[_index].name, 0) | (1 << _index)
+
+# Units grouped by strength, strongest first, for scorch
+STRENGTH_MASKS = sorted(
+    ((strength, _mask_where(lambda index, card, strength=strength: card.strength == strength))
+     for strength in {card.strength for card in all_cards if card.strength is not None}),
+    reverse=True,
+)
+
+# Strength sums of every byte of a mask, so a row sums in one lookup per 8 cards
+_CHUNKS = (NUM_CARDS + 7) // 8
+STRENGTH_BY_BYTE = [
+    [sum(STRENGTH[chunk * 8 + offset] for offset in range(8)
+         if value >> offset & 1 and chunk * 8 + offset < NUM_CARDS) for value in range(256)]
+    for chunk in range(_CHUNKS)
+]
+
+
+def strength_of(mask):
+    """
+    Sum the base strength of the cards in a mask.
+    :param mask: Integer bitmask over card ids.
+    :return: Total strength.
+    """
+    total = 0
+    for table in STRENGTH_BY_BYTE:
+        total += table[mask & 0xFF]
+        mask >>= 8
+    return total
+
+
+class BitState:
+    __slots__ = ("hands", "decks", "graveyards", "rows", "weather", "horn", "passed", "leader_used", "health")
+
+    def __init__(self):
+        """
+        Compact game state where every card set is an integer bitmask over card ids.
+
+        Index 0 of each pair is the player side and index 1 the AI side. Decks
+        are unordered remainders, so draws pick a card at random. Row effects
+        are 3-bit masks over ROW_NAMES.
+        """
+        self.hands = [0, 0]
+        self.decks = [0, 0]
+        self.graveyards = [0, 0]
+        self.rows = [[0, 0, 0], [0, 0, 0]]
+        self.weather = [0, 0]
+        self.horn = [0, 0]
+        self.passed = [False, False]
+        self.leader_used = [False, False]
+        self.health = [2, 2]
+
+    def copy(self):
+        """Return an independent copy of the state."""
+        state = BitState.__new__(BitState)
+        state.hands = self.hands[:]
+        state.decks = self.decks[:]
+        state.graveyards = self.graveyards[:]
+        state.rows = [self.rows[0][:], self.rows[1][:]]
+        state.weather = self.weather[:]
+        state.horn = self.horn[:]
+        state.passed = self.passed[:]
+        state.leader_used = self.leader_used[:]
+        state.health = self.health[:]
+        return state
+
+    def key(self):
+        """Return a hashable tuple of every field."""
+        return (tuple(self.hands), tuple(self.decks), tuple(self.graveyards), tuple(self.rows[0]),
+                tuple(self.rows[1]), tuple(self.weather), tuple(self.horn), tuple(self.passed),
+                tuple(self.leader_used), tuple(self.health))
+
+    def board(self, side):
+        """Return the mask of all cards on a side's rows."""
+        rows = self.rows[side]
+        return rows[0] | rows[1] | rows[2]
+
+    def row_score(self, side, row):
+        """
+        Score a row the way Row.calculate_score does.
+        :param side: 0 for the player, 1 for the AI.
+        :param row: Row index into ROW_NAMES.
+        :return: Row score.
+        """
+        cards = self.rows[side][row]
+        if self.weather[side] >> row & 1:
+            return (cards & UNIT_MASK).bit_count()
+        return strength_of(cards)
+
+    def score(self, side):
+        """
+        Score a side the way Board.calculate_total_score does.
+        :param side: 0 for the player, 1 for the AI.
+        :return: Total score.
+        """
+        return self.row_score(side, 0) + self.row_score(side, 1) + self.row_score(side, 2)
+
+    def calculate_total_score(self, player_type):
+        """Score a side by name, so a BitState can stand in for a Board."""
+        return self.score(SIDES.index(player_type))
+
+    def bond_count(self, side, name):
+        """
+        Count a Tight Bond group on a side's rows.
+
+        Ids are one per card name, so copies cannot be told apart and the
+        count is 0 or 1 with the current card.py (see BOND_GROUPS).
+
+        :param side: 0 for the player, 1 for the AI.
+        :param name: Name of the Tight Bond card.
+        :return: Number of copies on the board.
+        """
+        return (self.board(side) & BOND_GROUPS.get(name, 0)).bit_count()
+
+    def legal_moves(self, side):
+        """
+        List the card ids a side can play; an empty list means it must pass.
+        :param side: 0 for the player, 1 for the AI.
+        :return: List of card ids in the side's hand.
+        """
+        return [] if self.passed[side] else list(ids_of(self.hands[side]))
+
+    def draw(self, side, count, rng):
+        """
+        Move random cards from a side's deck into its hand.
+        :param side: 0 for the player, 1 for the AI.
+        :param count: Number of cards to draw.
+        :param rng: random.Random used to pick cards.
+        """
+        for _ in range(count):
+            deck = self.decks[side]
+            if not deck:
+                return
+            chosen = 1 << rng.choice(list(ids_of(deck)))
+            self.decks[side] = deck & ~chosen
+            self.hands[side] |= chosen
+
+    def play(self, side, card, rng):
+        """
+        Play a card from hand and resolve its ability.
+
+        Mirrors moves.GameState: spies go to the opponent and draw two, medics
+        bring back the strongest non-hero unit in the graveyard (graveyards
+        are unordered here), weather hits the opponent's rows.
+
+        :param side: 0 for the player, 1 for the AI.
+        :param card: Card id to play.
+        :param rng: random.Random used for draws.
+        """
+        card_bit = 1 << card
+        opponent = 1 - side
+        self.hands[side] &= ~card_bit
+        row = ROW_OF[card]
+
+        if card_bit & SPY_MASK:
+            if row >= 0:
+                self.rows[opponent][row] |= card_bit
+            self.draw(side, 2, rng)
+            return
+        if row >= 0:
+            self.rows[side][row] |= card_bit
+
+        if card_bit & SCORCH_MASK:
+            self.scorch()
+        elif card_bit & MEDIC_MASK:
+            candidates = self.graveyards[side] & PLACEABLE_MASK & ~HERO_MASK
+            if candidates:
+                target = max(ids_of(candidates), key=STRENGTH.__getitem__)
+                self.graveyards[side] &= ~(1 << target)
+                self.rows[side][ROW_OF[target]] |= 1 << target
+        elif card_bit & WEATHER_MASK:
+            self.weather[opponent] = 0b111
+        elif card_bit & HORN_MASK:
+            self.horn[side] = 0b111
+        elif card_bit & CLEAR_MASK:
+            self.weather = [0, 0]
+
+    def scorch(self):
+        """Remove the strongest units on each side, as Board.scorch_highest_units does."""
+        for side in (0, 1):
+            cards = self.board(side) & UNIT_MASK
+            burned = 0
+            for strength, mask in STRENGTH_MASKS:
+                if strength and cards & mask:
+                    burned = mask
+                    break
+            else:
+                burned = dict(STRENGTH_MASKS).get(0, 0)
+            rows = self.rows[side]
+            for row in range(3):
+                removed = rows[row] & burned
+                rows[row] &= ~removed
+                self.graveyards[side] |= removed
+
+    def end_round(self):
+        """
+        Score the round, take a life from the loser and clear the board.
+        :return: Index of the round winner, or None for a tie.
+        """
+        scores = self.score(0), self.score(1)
+        winner = None
+        if scores[0] != scores[1]:
+            winner = 0 if scores[0] > scores[1] else 1
+            self.health[1 - winner] -= 1
+        for side in (0, 1):
+            self.graveyards[side] |= self.board(side)
+            self.rows[side] = [0, 0, 0]
+            self.weather[side] = 0
+            self.horn[side] = 0
+            self.passed[side] = False
+        return winner
+
+    @classmethod
+    def from_objects(cls, board, player, ai):
+        """
+        Build a BitState from the object model.
+        :param board: The Board object.
+        :param player: The human Player.
+        :param ai: The AI Player.
+        :return: BitState.
+        """
+        state = cls()
+        for side, owner in enumerate((player, ai)):
+            state.hands[side] = mask_of(owner.hand)
+            state.decks[side] = mask_of(owner.deck.cards)
+            state.graveyards[side] = mask_of(owner.graveyard)
+            state.passed[side] = owner.passed
+            state.leader_used[side] = owner.leader_used
+            state.health[side] = owner.health
+            rows = board.player_rows if side == 0 else board.ai_rows
+            for index, name in enumerate(ROW_NAMES):
+                state.rows[side][index] = mask_of(rows[name].cards)
+                if "weather" in rows[name].effects:
+                    state.weather[side] |= 1 << index
+                if "horn" in rows[name].effects:
+                    state.horn[side] |= 1 << index
+        return state
+
+    def to_objects(self, board, player, ai):
+        """
+        Write the state back into the object model, e.g. for the GUI.
+
+        Cards keep their existing order where they stay in the same place;
+        deck order is otherwise not represented and cards are appended by id.
+
+        :param board: The Board object to update.
+        :param player: The human Player to update.
+        :param ai: The AI Player to update.
+        """
+        for side, owner in enumerate((player, ai)):
+            owner.hand = _reorder(owner.hand, self.hands[side])
+            owner.deck.cards = _reorder(owner.deck.cards, self.decks[side])
+            owner.graveyard = _reorder(owner.graveyard, self.graveyards[side])
+            owner.passed = self.passed[side]
+            owner.leader_used = self.leader_used[side]
+            owner.health = self.health[side]
+            rows = board.player_rows if side == 0 else board.ai_rows
+            for index, name in enumerate(ROW_NAMES):
+                row = rows[name]
+                row.cards = _reorder(row.cards, self.rows[side][index])
+                row.effects = [effect for effect in row.effects if effect not in ("weather", "horn")]
+                if self.weather[side] >> index & 1:
+                    row.effects.append("weather")
+                if self.horn[side] >> index & 1:
+                    row.effects.append("horn")
+
+
+def _reorder(cards, mask):
+    """Return the cards of mask, keeping the order they already have in cards."""
+    kept = [card for card in cards if mask >> card_id(card) & 1]
+    mask &= ~mask_of(kept)
+    return kept + [all_cards[index] for index in ids_of(mask)]
+
@@ -105,6 +105,14 @@ class Board:
         for row in target_rows.values():
             row.effects = []
 
+    def reset(self):
+        """
+        Empty every row and clear all effects, reusing the existing rows.
+        """
+        for row in list(self.player_rows.values()) + list(self.ai_rows.values()):
+            row.cards.clear()
+            row.effects.clear()
+
     def scorch_highest_units(self):
         """
         Scorch the highest-strength units on the board for both players.
@@ -1,6 +1,7 @@
 import pygame
 import sys
 import random
+from assets import default_cache
 
 class Card:
     def __init__(self, name, strength, row, ability=None, deck_type="faction", image_path=None):
@@ -22,23 +23,23 @@ class Card:
         self.image_path = image_path
         self.image = None
 
-        # Load the card image if an image path is provided
+        # Load the card image if an image path is provided; it is scaled when drawn
         if self.image_path:
             self.image = pygame.image.load(self.image_path)
-            self.image = pygame.transform.scale(self.image, (120, 180))  # Resize to standard card dimensions
 
-    def render(self, screen, x, y):
+    def render(self, screen, x, y, size=(120, 180)):
         """
         Render the card at the specified position on the screen.
 
         :param screen: The Pygame display surface.
         :param x: The x-coordinate of the card's position.
         :param y: The y-coordinate of the card's position.
+        :param size: (width, height) to draw the card at.
         """
         if self.image:
-            screen.blit(self.image, (x, y))  # Draw the card image
+            screen.blit(default_cache.scaled(self.image_path, self.image, size), (x, y))  # Draw the card image
         else:
-            pygame.draw.rect(screen, (255, 255, 255), (x, y, 120, 180))  # Placeholder rectangle
+            pygame.draw.rect(screen, (255, 255, 255), (x, y, *size))  # Placeholder rectangle
             font = pygame.font.Font(None, 24)
             name_text = font.render(self.name, True, (0, 0, 0))
             if self.strength is not None:
@@ -197,4 +198,19 @@ nilfgaardian_deck = initialize_deck(nilfgaardian_data)
 neutral_deck = initialize_deck(neutral_data)
 special_cards = initialize_deck(special_cards_data)
 
-__all__ = ["northern_realms_deck", "nilfgaardian_deck", "neutral_deck", "special_cards"]
+# Card ids: every card defined above, numbered in definition order
+all_cards = northern_realms_deck + nilfgaardian_deck + neutral_deck + special_cards
+card_ids = {card.name: index for index, card in enumerate(all_cards)}
+
+
+def card_id(card):
+    """
+    Look up the stable integer id of a card.
+    :param card: The card (Card object).
+    :return: Index of the card in all_cards.
+    """
+    return card_ids[card.name]
+
+
+__all__ = ["northern_realms_deck", "nilfgaardian_deck", "neutral_deck", "special_cards",
+           "all_cards", "card_ids", "card_id"]
@@ -1,5 +1,6 @@
 import random
 from card import Card, HeroCard, WeatherCard, SpecialCard
+from mulligan import MulliganTables
 
 class Deck:
     def __init__(self, faction_name, faction_cards, neutral_cards, special_cards, leader_card=None):
@@ -16,6 +17,7 @@ class Deck:
         self.cards = faction_cards + neutral_cards + special_cards
         self.leader_card = leader_card
         self.graveyard = []
+        self.mulligan_tables = MulliganTables(self.cards)  # Redraw advice for this decklist
         self.shuffle()
 
     def shuffle(self):
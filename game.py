@@ -5,28 +5,36 @@ from ai_controller import AIController
 from gui import GUI
 
 class Game:
-    def __init__(self, player, ai, screen):
+    def __init__(self, player, ai, screen, spectator_feed=None, make_ai_controller=None):
         """
         Initialize the Game object.
 
         :param player: The human player (Player object).
         :param ai: The AI opponent (Player object).
         :param screen: Pygame screen object for rendering.
+        :param spectator_feed: Optional SpectatorFeed to broadcast the match to.
+        :param make_ai_controller: Optional callable (ai, board, player) building the AI's controller,
+            e.g. search.SearchAIController; defaults to the weighted-chance AIController.
         """
         self.player = player
         self.ai = ai
         self.screen = screen
         self.board = Board()
         self.gui = GUI(screen)  # Initialize GUI
-        self.ai_controller = AIController(ai, self.board)
+        if make_ai_controller:
+            self.ai_controller = make_ai_controller(ai, self.board, player)
+        else:
+            self.ai_controller = AIController(ai, self.board)
         self.rounds_played = 0
         self.current_turn = None  # 'player' or 'ai'
+        self.spectator_feed = spectator_feed
 
     def coin_toss(self):
         """
         Perform a coin toss to determine who goes first.
         """
         self.current_turn = random.choice(['player', 'ai'])
+        self.ai_controller.went_first = self.current_turn == 'ai'
         self.gui.show_notification(f"Coin toss result: {self.current_turn.capitalize()} goes first!")
 
     def redraw_phase(self):
@@ -35,30 +43,33 @@ class Game:
         """
         self.gui.show_notification("Redraw phase: Replace up to 2 cards.")
 
-        # Player redraw logic
-        player_replacements = []
-        while len(player_replacements) < 2:
-            self.gui.draw_hand(self.player.hand)
-            self.gui.update_screen()
-            print("Your hand:")
-            for idx, card in enumerate(self.player.hand):
-                print(f"{idx + 1}. {card.name} ({card.strength if card.strength else 'Special'})")
-            choice = input("Enter card number to replace (or press Enter to finish): ")
-            if not choice:
+        # Hint from the deck's mulligan tables
+        advised, gain = self.player.deck.mulligan_tables.best_redraw(self.player.hand)
+        if advised:
+            names = " and ".join(self.player.hand[index].name for index in advised)
+            self.gui.show_notification(f"Hint: replace {names} (+{gain:.1f} expected)")
+        else:
+            self.gui.show_notification("Hint: keep your hand.")
+
+        # Player redraw logic: click cards to mark them, right click or Enter to finish
+        marked = []
+        while len(marked) < 2:
+            choice = self.gui.choose_card(self.board, self.player.hand, self.player.total_score,
+                                          self.ai.total_score, marked=marked, allow_finish=True)
+            if choice is None:
                 break
-            try:
-                choice = int(choice) - 1
-                if 0 <= choice < len(self.player.hand):
-                    player_replacements.append(self.player.hand[choice])
-            except ValueError:
-                print("Invalid input. Try again.")
+            if choice in marked:
+                marked.remove(choice)
+            else:
+                marked.append(choice)
 
+        player_replacements = [self.player.hand[index] for index in marked]
         for card in player_replacements:
             self.player.hand.remove(card)
             self.player.hand.append(self.player.deck.draw(1)[0])
 
         # AI redraw logic
-        self.ai_controller.play_turn(None)  # AI will perform a redraw as part of its logic
+        self.ai_controller.redraw()
 
     def start_round(self):
         """
@@ -82,13 +93,21 @@ class Game:
         if player_score > ai_score:
             self.ai.health -= 1
             self.gui.show_notification("You win the round!")
+            winner = "player"
         elif ai_score > player_score:
             self.player.health -= 1
             self.gui.show_notification("AI wins the round!")
+            winner = "ai"
         else:
             self.gui.show_notification("Round is a tie!")
+            winner = None
 
-        self.board = Board()  # Reset the board for the next round
+        self.ai_controller.went_first = None  # Opening books only cover the first round
+        self.board.reset()  # Reuse the board for the next round
+        self.gui.reset_board(self.board)
+        if self.spectator_feed:
+            self.spectator_feed.round_end(winner)
+            self.spectator_feed.publish(self.board, self.player, self.ai)
 
     def is_game_over(self):
         """
@@ -102,36 +121,30 @@ class Game:
         Handle a single turn of the game.
         """
         if self.current_turn == "player":
+            self.ai_controller.begin_pondering()  # The AI may think ahead while the player chooses
             self.gui.show_notification("Your turn!")
-            selected_card = None
-            while not selected_card:
-                self.gui.draw_board(self.board, self.player.total_score, self.ai.total_score)
-                self.gui.draw_hand(self.player.hand)
-                self.gui.update_screen()
-
-                # Prompt player to choose a card
-                print("Your hand:")
-                for idx, card in enumerate(self.player.hand):
-                    print(f"{idx + 1}. {card.name} ({card.strength if card.strength else 'Special'})")
-                choice = input("Choose a card to play (Enter card number): ")
-                try:
-                    choice = int(choice) - 1
-                    if 0 <= choice < len(self.player.hand):
-                        selected_card = self.player.hand.pop(choice)
-                        self.board.place_card(selected_card, "player")
-                        self.gui.show_notification(f"You played: {selected_card.name}")
-                        if selected_card.ability:
-                            self.handle_special_ability(selected_card, "player")
-                except ValueError:
-                    print("Invalid input. Try again.")
+            # Player clicks a card in their hand to play it
+            choice = self.gui.choose_card(self.board, self.player.hand, self.player.total_score, self.ai.total_score)
+            origin = self.gui.layout.slots("hand")[choice].rect.topleft
+            selected_card = self.player.hand.pop(choice)
+            self.board.place_card(selected_card, "player")
+            self.gui.animate_board_changes(self.board, origin)
+            self.gui.show_notification(f"You played: {selected_card.name}")
+            if selected_card.ability:
+                self.handle_special_ability(selected_card, "player")
+            self.ai_controller.end_pondering(selected_card)
 
             self.current_turn = "ai"
 
         elif self.current_turn == "ai":
             self.gui.show_notification("AI's turn!")
-            self.ai_controller.play_turn(self.board.calculate_total_score("player"))
+            # AI thinks on a worker thread so the window keeps rendering
+            self.gui.run_in_background(self.ai_controller.play_turn, self.board.calculate_total_score("player"))
             self.current_turn = "player"
 
+        if self.spectator_feed:
+            self.spectator_feed.publish(self.board, self.player, self.ai)
+
     def handle_special_ability(self, card, player_type):
         """
         Handle special abilities of the played card.
@@ -185,3 +198,4 @@ class Game:
             self.gui.show_notification("Congratulations! You win the game!")
         else:
             self.gui.show_notification("The AI wins. Better luck next time!")
+        print(f"Frame stats: {self.gui.frame_report()}")
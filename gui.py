@@ -1,14 +1,33 @@
+import sys
+import threading
 import pygame
 from pygame.locals import *
+from layout import BoardLayout, ROW_NAMES
+from assets import default_cache
+from animation import Animator, FrameStats, CardMove, ScorchRemoval, WeatherOverlay, Notification, ScoreCounter
 
 class GUI:
-    def __init__(self, screen):
+    def __init__(self, screen, fps=60):
         """
         Initialize the GUI.
         :param screen: Pygame screen object for rendering.
+        :param fps: Display rate to render at.
         """
         self.screen = screen
-        self.font = pygame.font.Font(None, 36)
+        self.layout = BoardLayout(*screen.get_size())
+        self.font = pygame.font.Font(None, self.layout.font_size)
+        self.assets = default_cache
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.animator = Animator()
+        self.frame_stats = FrameStats(fps)
+        self.show_frame_stats = False  # Frame-time overlay, toggled with F3
+        self.scores = {"Player": ScoreCounter(), "AI": ScoreCounter()}
+        self.animator.counters.extend(self.scores.values())
+        self.hidden = set()  # Ids of cards currently drawn by an animation
+        self.shown = {}  # (owner, row_name) -> card slots when the board was last animated
+        self.row_effects = {}  # (owner, row_name) -> effects when the board was last animated
+        self.scene = None  # (board, hand) redrawn on every frame
 
     def draw_board(self, board, player_score, ai_score):
         """
@@ -19,42 +38,42 @@ class GUI:
         """
         self.screen.fill((0, 128, 0))  # Green background
 
-        # Draw AI rows
-        y_offset = 50
-        for row_name, row in board.ai_rows.items():
-            self.draw_row(row, y_offset, row_name, "AI")
-            y_offset += 150
+        self.layout.update_board(board)
+        self.scene = (board, self.scene[1] if self.scene else None)
+        self.scores["Player"].target = player_score
+        self.scores["AI"].target = ai_score
 
-        # Draw Player rows
-        y_offset = 450
+        # Draw AI rows, then Player rows
+        for row_name, row in board.ai_rows.items():
+            self.draw_row(row, row_name, "AI")
         for row_name, row in board.player_rows.items():
-            self.draw_row(row, y_offset, row_name, "Player")
-            y_offset += 150
+            self.draw_row(row, row_name, "Player")
 
         # Display scores
-        self.draw_text(f"Player Score: {player_score}", 50, 650)
-        self.draw_text(f"AI Score: {ai_score}", 50, 20)
+        alpha = self.animator.alpha
+        self.draw_text(f"Player Score: {self.scores['Player'].display(alpha)}", *self.layout.text_position(6))
+        self.draw_text(f"AI Score: {self.scores['AI'].display(alpha)}", *self.layout.text_position(-1))
 
-    def draw_row(self, row, y_offset, row_name, owner):
+    def draw_row(self, row, row_name, owner):
         """
         Render a single row on the board.
         :param row: The Row object to render.
-        :param y_offset: Vertical offset for the row.
         :param row_name: The name of the row (e.g., "close").
         :param owner: The owner of the row ("Player" or "AI").
         """
+        band = (0 if owner == "AI" else 3) + ROW_NAMES.index(row_name)
+
         # Row label
-        self.draw_text(f"{owner} {row_name.capitalize()} Row", 50, y_offset - 30)
+        self.draw_text(f"{owner} {row_name.capitalize()} Row", *self.layout.text_position(band))
 
         # Draw cards in the row
-        x_offset = 50
-        for card in row.cards:
-            self.draw_card(card, x_offset, y_offset)
-            x_offset += 140
+        for slot in self.layout.slots((owner, row_name)):
+            if id(slot.card) not in self.hidden:
+                self.draw_card(slot.card, slot.rect.x, slot.rect.y)
 
         # Draw effects
         effect_text = ", ".join(row.effects) if row.effects else "No Effects"
-        self.draw_text(f"Effects: {effect_text}", 50, y_offset + 100)
+        self.draw_text(f"Effects: {effect_text}", *self.layout.text_position(band, 1))
 
     def draw_card(self, card, x, y):
         """
@@ -64,24 +83,235 @@ class GUI:
         :param y: Vertical position.
         """
         if card.image:
-            self.screen.blit(card.image, (x, y))
+            self.screen.blit(self.assets.scaled(card.image_path, card.image, self.layout.card_size), (x, y))
         else:
-            pygame.draw.rect(self.screen, (255, 255, 255), (x, y, 120, 180))
+            pygame.draw.rect(self.screen, (255, 255, 255), (x, y, *self.layout.card_size))
             self.draw_text(card.name, x + 10, y + 10)
 
-    def draw_hand(self, hand, selected_index=None):
+    def draw_hand(self, hand, selected_index=None, marked=()):
         """
         Render the player's hand.
         :param hand: List of Card objects in the player's hand.
         :param selected_index: Highlight the selected card if applicable.
+        :param marked: Indices of cards to outline as already picked.
+        """
+        self.layout.update_hand(hand)
+        self.scene = (self.scene[0] if self.scene else None, hand)
+        for slot in self.layout.slots("hand"):
+            rect = slot.rect
+            if slot.index == selected_index:
+                pygame.draw.rect(self.screen, (255, 255, 0), rect.inflate(10, 10), 5)  # Highlight
+            elif slot.index in marked:
+                pygame.draw.rect(self.screen, (255, 0, 0), rect.inflate(10, 10), 5)
+            self.draw_card(slot.card, rect.x, rect.y)
+
+    def choose_card(self, board, hand, player_score, ai_score, marked=(), allow_finish=False):
+        """
+        Let the player pick a card from their hand with the mouse.
+
+        Hovered cards are highlighted; a left click picks the card. When
+        allow_finish is set, a right click or Enter finishes without a pick.
+
+        :param board: The Board object to draw behind the hand.
+        :param hand: List of Card objects in the player's hand.
+        :param player_score: Player's current total score.
+        :param ai_score: AI's current total score.
+        :param marked: Indices of cards to outline as already picked.
+        :param allow_finish: Whether the player may finish without picking.
+        :return: Index of the clicked card, or None if the player finished.
+        """
+        self.layout.update_board(board)
+        self.layout.update_hand(hand)
+        self.scene = (board, hand)
+        self.scores["Player"].target = player_score
+        self.scores["AI"].target = ai_score
+        hovered = None
+        self.clock.tick()
+        while True:
+            for event in pygame.event.get():
+                if event.type == KEYDOWN and event.key in (K_RETURN, K_KP_ENTER):
+                    if allow_finish:
+                        return None
+                elif event.type in (QUIT, VIDEORESIZE, KEYDOWN):
+                    self.handle_window_event(event)
+                elif event.type == MOUSEMOTION:
+                    slot = self.layout.hit_test(event.pos)
+                    hovered = slot.index if slot and slot.zone == "hand" else None
+                elif event.type == MOUSEBUTTONDOWN:
+                    slot = self.layout.hit_test(event.pos)
+                    if event.button == 1 and slot and slot.zone == "hand":
+                        return slot.index
+                    if event.button == 3 and allow_finish:
+                        return None
+
+            self.render_frame(hovered, marked)
+
+    def render_frame(self, selected_index=None, marked=()):
+        """
+        Draw one frame of the current scene and advance running animations.
+
+        Waits for the next frame at the display rate, so calling this in a
+        loop renders at a steady rate no matter what the game logic is doing.
+
+        :param selected_index: Hand card to highlight.
+        :param marked: Indices of hand cards to outline as already picked.
+        """
+        frame_time = self.clock.tick(self.fps) / 1000
+        if self.screen.get_size() != self.layout.size:
+            self.resize()
+        self.frame_stats.record(frame_time)
+        self.animator.advance(frame_time)
+        self.hidden = self.animator.hidden_cards()
+
+        board, hand = self.scene if self.scene else (None, None)
+        if board is not None:
+            self.animate_board_changes(board)
+            self.draw_board(board, self.scores["Player"].target, self.scores["AI"].target)
+        else:
+            self.screen.fill((0, 128, 0))
+        if hand is not None:
+            self.draw_hand(hand, selected_index, marked)
+        self.animator.draw(self)
+        if self.show_frame_stats:
+            self.draw_text(self.frame_report(), 10, 10, (255, 255, 0))
+        self.update_screen()
+
+    def frame_report(self):
+        """
+        Summarize frame times on one line.
+        :return: Text with the frame count, dropped frames and recent frame times.
+        """
+        stats = self.frame_stats.report()
+        if not stats["frames"]:
+            return "No frames rendered"
+        return (f"{stats['frames']} frames, {stats['dropped_frames']} dropped, "
+                f"mean {stats['mean_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+
+    def pump_events(self):
+        """
+        Handle window events while no input is expected.
         """
-        x_offset = 50
-        y_offset = 700
-        for index, card in enumerate(hand):
-            if index == selected_index:
-                pygame.draw.rect(self.screen, (255, 255, 0), (x_offset - 5, y_offset - 5, 130, 190), 5)  # Highlight
-            self.draw_card(card, x_offset, y_offset)
-            x_offset += 140
+        for event in pygame.event.get():
+            self.handle_window_event(event)
+
+    def handle_window_event(self, event):
+        """
+        Quit, follow window resizes, toggle fullscreen with F11 and the frame-time overlay with F3.
+        :param event: The Pygame event.
+        """
+        if event.type == QUIT:
+            pygame.quit()
+            sys.exit()
+        elif event.type == VIDEORESIZE:
+            self.screen = pygame.display.get_surface()
+            self.resize()
+        elif event.type == KEYDOWN and event.key == K_F11:
+            pygame.display.toggle_fullscreen()
+            self.screen = pygame.display.get_surface()
+            self.resize()
+        elif event.type == KEYDOWN and event.key == K_F3:
+            self.show_frame_stats = not self.show_frame_stats
+
+    def resize(self):
+        """
+        Lay everything out again for the current display size.
+
+        Cards already on the board jump to their new positions instead of
+        animating, and card art is rescaled lazily as it is drawn.
+        """
+        self.layout.resize(*self.screen.get_size())
+        self.font = pygame.font.Font(None, self.layout.font_size)
+        board, hand = self.scene if self.scene else (None, None)
+        if board is not None:
+            self.reset_board(board)
+        if hand is not None:
+            self.layout.update_hand(hand)
+
+    def wait(self, seconds):
+        """
+        Keep rendering frames for a while.
+        :param seconds: How long to keep rendering.
+        """
+        self.clock.tick()
+        remaining = seconds
+        while remaining > 0:
+            self.pump_events()
+            self.render_frame()
+            remaining -= self.clock.get_time() / 1000
+
+    def run_in_background(self, function, *args):
+        """
+        Run game logic on a worker thread while frames keep rendering.
+        :param function: The callable to run (must not draw).
+        :param args: Arguments for the callable.
+        :return: Whatever the callable returned.
+        """
+        outcome = {}
+
+        def worker():
+            try:
+                outcome["result"] = function(*args)
+            except BaseException as error:
+                outcome["error"] = error
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        self.clock.tick()
+        while thread.is_alive():
+            self.pump_events()
+            self.render_frame()
+        while self.animator.busy:
+            self.pump_events()
+            self.render_frame()
+
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def animate_board_changes(self, board, origin=None):
+        """
+        Animate everything that changed on the board since it was last shown.
+
+        New cards slide in from origin (or from above the screen), removed cards
+        burn away and newly applied weather tints its row. Called on every
+        frame, so changes made by game logic animate without extra calls.
+
+        :param board: The Board object after the change.
+        :param origin: (x, y) position new cards start from.
+        """
+        self.layout.update_board(board)
+        for owner, rows in (("AI", board.ai_rows), ("Player", board.player_rows)):
+            for row_name, row in rows.items():
+                zone = (owner, row_name)
+                slots = self.layout.slots(zone)
+                previous = self.shown.get(zone, [])
+                if slots is not previous:
+                    current = {id(slot.card) for slot in slots}
+                    for slot in previous:
+                        if id(slot.card) not in current:
+                            self.animator.add(ScorchRemoval(slot.card, slot.rect.topleft))
+                    before = {id(slot.card) for slot in previous}
+                    for slot in slots:
+                        if id(slot.card) not in before:
+                            start = origin or (slot.rect.x, -self.layout.card_height)
+                            self.animator.add(CardMove(slot.card, start, slot.rect.topleft))
+                    self.shown[zone] = slots
+
+                if "weather" in row.effects and "weather" not in self.row_effects.get(zone, ()):
+                    top = self.layout.row_top(owner, row_name) - (self.layout.band - self.layout.card_height) / 2
+                    self.animator.add(WeatherOverlay((0, top, self.screen.get_width(), self.layout.band)))
+                self.row_effects[zone] = list(row.effects)
+        self.hidden = self.animator.hidden_cards()
+
+    def reset_board(self, board):
+        """
+        Show a new board without animating the change.
+        :param board: The Board object to show.
+        """
+        self.layout.update_board(board)
+        self.shown = {zone: self.layout.slots(zone) for zone in self.layout.zones if zone != "hand"}
+        self.row_effects = {}
+        self.scene = (board, self.scene[1] if self.scene else None)
 
     def draw_text(self, text, x, y, color=(255, 255, 255)):
         """
@@ -105,6 +335,8 @@ class GUI:
         Display a notification or turn message.
         :param message: Notification message to display.
         """
-        self.draw_text(message, 600, 360, color=(255, 0, 0))  # Centered notification
-        self.update_screen()
-        pygame.time.wait(2000)  # Display for 2 seconds
+        width, height = self.screen.get_size()
+        text_width, text_height = self.font.size(message)
+        notification = Notification(message, ((width - text_width) // 2, (height - text_height) // 2))  # Centered notification
+        self.animator.add(notification)
+        self.wait(notification.duration)  # Display for 2 seconds
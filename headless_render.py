@@ -0,0 +1,214 @@
+import os
+import struct
+import time
+import zlib
+from array import array
+from multiprocessing import Pool
+
+# Set before pygame is initialised anywhere in the process, so no window is ever opened
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")  # Otherwise SDL swallows the SIGTERM that stops pool workers
+
+import pygame
+from bitboard import BitState, ROW_NAMES, ids_of
+from board import Board
+from card import all_cards
+from gui import GUI
+from search import STATE_SIZE, decode_state, encode_state
+
+
+class HeadlessRenderer:
+    def __init__(self, size=(1280, 720)):
+        """
+        Draw board states onto an offscreen surface with the GUI's own drawing code.
+
+        Card art is decoded once when card.py is imported and scaled copies
+        are kept in the asset cache, so every renderer in a process shares
+        one asset set.
+
+        :param size: (width, height) of the rendered images; small sizes make thumbnails.
+        """
+        if not pygame.display.get_init():
+            pygame.display.init()
+        if not pygame.font.get_init():
+            pygame.font.init()
+        self.surface = pygame.Surface(size)
+        self.gui = GUI(self.surface)
+
+    def render(self, state, hand_side=0):
+        """
+        Draw a state.
+        :param state: The BitState to show.
+        :param hand_side: Side whose hand is shown at the bottom (None for no hand).
+        :return: The offscreen Surface (reused by the next call).
+        """
+        board = Board()
+        for side, rows in enumerate((board.player_rows, board.ai_rows)):
+            for index, name in enumerate(ROW_NAMES):
+                row = rows[name]
+                row.cards = [all_cards[card] for card in ids_of(state.rows[side][index])]
+                if state.weather[side] >> index & 1:
+                    row.effects.append("weather")
+                if state.horn[side] >> index & 1:
+                    row.effects.append("horn")
+
+        # Show final scores instead of counting up to them
+        for name, side in (("Player", 0), ("AI", 1)):
+            counter = self.gui.scores[name]
+            counter.target = counter.value = counter.previous_value = state.score(side)
+
+        self.gui.reset_board(board)
+        self.gui.draw_board(board, state.score(0), state.score(1))
+        if hand_side is not None:
+            self.gui.draw_hand([all_cards[card] for card in ids_of(state.hands[hand_side])])
+        return self.surface
+
+    def save(self, state, path, hand_side=0):
+        """
+        Render a state to an image file.
+        :param state: The BitState to show.
+        :param path: Output path; the extension picks the format (e.g. .png).
+        :param hand_side: Side whose hand is shown.
+        """
+        surface = self.render(state, hand_side)
+        if path.lower().endswith(".png"):
+            write_png(surface, path)
+        else:
+            pygame.image.save(surface, path)
+
+
+def write_png(surface, path, level=1):
+    """
+    Write a surface as an RGB PNG with fast compression.
+
+    pygame.image.save compresses PNGs hard, which costs more than drawing
+    the frame; board images are mostly flat colour and stay small at a low
+    zlib level.
+
+    :param surface: The Surface to write.
+    :param path: Output path.
+    :param level: zlib compression level.
+    """
+    width, height = surface.get_size()
+    pixels = pygame.image.tobytes(surface, "RGB")
+    stride = width * 3
+    # Every scanline starts with filter type 0 (none)
+    scanlines = b"".join(b"\x00" + pixels[row * stride:(row + 1) * stride] for row in range(height))
+    with open(path, "wb") as image_file:
+        image_file.write(b"\x89PNG\r\n\x1a\n")
+        image_file.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        image_file.write(_png_chunk(b"IDAT", zlib.compress(scanlines, level)))
+        image_file.write(_png_chunk(b"IEND", b""))
+
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def replay_frames(seed, player_faction, ai_faction, agents=("rollout", "rollout")):
+    """
+    Replay a simulated match and capture the board before every move.
+
+    A round only ends on a pass, which leaves the board as it was, so the
+    last frame of each round shows that round's final board.
+
+    :param seed: Seed of the match (see simulation.simulate).
+    :param player_faction: Faction name of the player seat.
+    :param ai_faction: Faction name of the AI seat.
+    :param agents: Agent names for the two seats.
+    :return: List of encoded states (int64 arrays, see search.encode_state).
+    """
+    from simulation import make_policy, simulate
+
+    frames = []
+
+    def capture(state, side, move, round_number, ply):
+        frames.append(_encode(state))
+
+    simulate(seed, player_faction, ai_faction, [make_policy(agent) for agent in agents], observer=capture)
+    return frames
+
+
+def _encode(state):
+    buffer = array("q", bytes(8 * STATE_SIZE))
+    encode_state(state, buffer)
+    return buffer
+
+
+# Renderer of the current worker process
+_worker = {}
+
+
+def _start_worker(size, hand_side):
+    """Pool initializer: one renderer, and so one asset set, per worker."""
+    _worker["renderer"] = HeadlessRenderer(size)
+    _worker["hand_side"] = hand_side
+
+
+def _render_chunk(task):
+    """Worker entry point: render and write a list of (path, encoded state) frames."""
+    renderer = _worker["renderer"]
+    for path, encoded in task:
+        renderer.save(decode_state(encoded), path, _worker["hand_side"])
+    return len(task)
+
+
+def render_batch(frames, out_dir, size=(1280, 720), hand_side=0, processes=None, chunk=32):
+    """
+    Render many states to PNG files in parallel.
+    :param frames: Iterable of (name, state) where state is a BitState or an encoded state.
+    :param out_dir: Output directory (created if missing); files are named <name>.png.
+    :param size: (width, height) of the images.
+    :param hand_side: Side whose hand is shown (None for no hand).
+    :param processes: Number of worker processes (defaults to the CPU count).
+    :param chunk: Frames per worker task.
+    :return: (frames written, seconds taken).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+    written = 0
+    pool = Pool(processes, _start_worker, (size, hand_side))
+    try:
+        for count in pool.imap_unordered(_render_chunk, _chunks(frames, out_dir, chunk)):
+            written += count
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return written, time.perf_counter() - started
+
+
+def _chunks(frames, out_dir, chunk):
+    batch = []
+    for name, state in frames:
+        encoded = _encode(state) if isinstance(state, BitState) else state
+        batch.append((os.path.join(out_dir, f"{name}.png"), encoded))
+        if len(batch) == chunk:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render PNG frames of simulated matches.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--games", type=int, default=10, help="Number of seeds to replay")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--processes", type=int, default=None)
+    arguments = parser.parse_args()
+
+    def every_frame():
+        for seed in range(arguments.games):
+            for turn, encoded in enumerate(replay_frames(seed, "Northern Realms", "Nilfgaardian Empire")):
+                yield f"game{seed:05d}-turn{turn:03d}", encoded
+
+    count, seconds = render_batch(every_frame(), arguments.out_dir, (arguments.width, arguments.height),
+                                  processes=arguments.processes)
+    print(f"Rendered {count} frames in {seconds:.1f}s ({count / seconds * 60:.0f} frames per minute)")
@@ -0,0 +1,164 @@
+from collections import namedtuple
+import pygame
+
+ROW_NAMES = ["close", "ranged", "siege"]
+BANDS = 7.6  # Six rows and the hand, plus a strip at the top for the AI score
+TOP_STRIP = 0.6  # Height of the top strip, in bands
+CARD_ASPECT = 2 / 3  # Card art is 120x180
+CARD_GAP = 0.15  # Gap between neighbouring cards, as a fraction of card width
+LABEL_COLUMN = 0.2  # Width of the row label column, as a fraction of screen width
+
+# zone is "hand" or (owner, row_name); index is the card's position in that zone
+CardSlot = namedtuple("CardSlot", ["zone", "index", "card", "rect"])
+
+
+class BoardLayout:
+    def __init__(self, width=1280, height=720):
+        """
+        Card rectangles for the hand and every row, plus a grid index for hit-testing.
+
+        All positions and sizes are derived from the display size. Rectangles
+        are only recomputed when the cards in a zone change or the display is
+        resized, and a mouse position is resolved by looking at a single grid cell.
+
+        :param width: Display width in pixels.
+        :param height: Display height in pixels.
+        """
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """
+        Recompute all metrics for a new display size.
+        :param width: Display width in pixels.
+        :param height: Display height in pixels.
+        """
+        self.size = (width, height)
+        self.band = height / BANDS
+        self.card_height = max(1, int(self.band * 0.9))
+        self.card_width = max(1, int(self.card_height * CARD_ASPECT))
+        self.spacing = int(self.card_width * (1 + CARD_GAP))
+        self.margin = max(4, int(width * 0.02))
+        self.cards_left = int(width * LABEL_COLUMN)
+        self.font_size = max(12, int(self.band * 0.24))
+        self.cell_width = max(1, self.spacing)
+        self.cell_height = max(1, self.card_height // 3)
+
+        self.zones = {}  # zone -> list of CardSlot
+        self.signatures = {}  # zone -> identities of the cards last laid out
+        self.grid = {}  # (column, row) -> list of CardSlot, topmost last
+        self.dirty = True
+
+    @property
+    def card_size(self):
+        return self.card_width, self.card_height
+
+    def band_top(self, band):
+        """
+        Get the y-coordinate of a band (0-2 AI rows, 3-5 player rows, 6 the hand).
+        :param band: Band index.
+        :return: Vertical position of the band's cards.
+        """
+        return int((TOP_STRIP + band) * self.band + (self.band - self.card_height) / 2)
+
+    def row_top(self, owner, row_name):
+        """
+        Get the y-coordinate of a row's cards.
+        :param owner: "Player" or "AI".
+        :param row_name: "close", "ranged" or "siege".
+        :return: Vertical position of the row.
+        """
+        first_band = 0 if owner == "AI" else 3
+        return self.band_top(first_band + ROW_NAMES.index(row_name))
+
+    @property
+    def hand_top(self):
+        return self.band_top(6)
+
+    def card_left(self, index, count=1):
+        """
+        Get the x-coordinate of the card at a position within a zone.
+
+        Cards overlap when a zone holds more than fit across the screen.
+
+        :param index: Position of the card in its row or hand.
+        :param count: Number of cards in the zone.
+        :return: Horizontal position of the card.
+        """
+        spacing = self.spacing
+        available = self.size[0] - self.cards_left - self.margin - self.card_width
+        if count > 1 and spacing * (count - 1) > available:
+            spacing = max(1, available // (count - 1))
+        return self.cards_left + index * spacing
+
+    def text_position(self, band, line=0):
+        """
+        Get a position in the label column.
+        :param band: Band index (-1 for the top strip).
+        :param line: Line of text within the band.
+        :return: (x, y) position.
+        """
+        top = TOP_STRIP * self.band * 0.2 if band < 0 else (TOP_STRIP + band) * self.band + self.band * 0.1
+        return self.margin, int(top + line * self.font_size * 1.1)
+
+    def update_board(self, board):
+        """
+        Lay out the cards on both sides of the board.
+        :param board: The Board object.
+        """
+        for owner, rows in (("AI", board.ai_rows), ("Player", board.player_rows)):
+            for row_name, row in rows.items():
+                self._update_zone((owner, row_name), row.cards, self.row_top(owner, row_name))
+
+    def update_hand(self, hand):
+        """
+        Lay out the cards in the player's hand.
+        :param hand: List of Card objects.
+        """
+        self._update_zone("hand", hand, self.hand_top)
+
+    def slots(self, zone):
+        """
+        Get the laid-out cards of a zone.
+        :param zone: "hand" or (owner, row_name).
+        :return: List of CardSlot.
+        """
+        return self.zones.get(zone, [])
+
+    def hit_test(self, pos):
+        """
+        Find the card under a screen position.
+        :param pos: (x, y) screen position.
+        :return: The topmost CardSlot at that position, or None.
+        """
+        if self.dirty:
+            self._rebuild_grid()
+        x, y = pos
+        for slot in reversed(self.grid.get((x // self.cell_width, y // self.cell_height), ())):
+            if slot.rect.collidepoint(x, y):
+                return slot
+        return None
+
+    def _update_zone(self, zone, cards, top):
+        signature = tuple(map(id, cards))
+        if self.signatures.get(zone) == signature:
+            return
+        self.signatures[zone] = signature
+        count = len(cards)
+        self.zones[zone] = [
+            CardSlot(zone, index, card,
+                     pygame.Rect(self.card_left(index, count), top, self.card_width, self.card_height))
+            for index, card in enumerate(cards)
+        ]
+        self.dirty = True
+
+    def _rebuild_grid(self):
+        self.grid = {}
+        # Rows first and the hand last; within a zone later cards overlap earlier ones
+        zones = [zone for zone in self.zones if zone != "hand"] + (["hand"] if "hand" in self.zones else [])
+        for zone in zones:
+            for slot in self.zones[zone]:
+                rect = slot.rect
+                for column in range(rect.left // self.cell_width, (rect.right - 1) // self.cell_width + 1):
+                    for row in range(rect.top // self.cell_height, (rect.bottom - 1) // self.cell_height + 1):
+                        self.grid.setdefault((column, row), []).append(slot)
+        self.dirty = False
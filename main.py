@@ -1,6 +1,10 @@
+from functools import partial
 from  card import northern_realms_deck, nilfgaardian_deck, neutral_deck, special_cards
 from deck import Deck
 from player import Player
+from game import Game
+from pondering import Ponderer
+from search import SearchAIController
 import pygame
 
 
@@ -9,7 +13,7 @@ def initialize_screen():
     Initialize the Pygame screen and window.
     """
     pygame.init()
-    screen = pygame.display.set_mode((1280, 720))
+    screen = pygame.display.set_mode((1280, 720), pygame.RESIZABLE)
     pygame.display.set_caption("Gwent: The Card Game")
     return screen
 
@@ -85,26 +89,13 @@ def main():
     for card in player.hand:
         print(f"- {card.name} ({card.strength if card.strength else 'Special'})")
 
-    # Game loop (placeholder for now)
-    running = True
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-        # Render screen
-        screen.fill((0, 128, 0))  # Green background
-        y_offset = 50
-
-        # Render player hand
-        for i, card in enumerate(player.hand):
-            card.render(screen, 50 + i * 140, 500)
-
-        # Render AI placeholder
-        for i, card in enumerate(ai.hand):
-            pygame.draw.rect(screen, (255, 0, 0), (50 + i * 140, 50, 120, 180))  # Placeholder
-
-        pygame.display.flip()
+    # Search AI that keeps thinking about its replies while the player chooses a card
+    ponderer = Ponderer()
+    try:
+        game = Game(player, ai, screen, make_ai_controller=partial(SearchAIController, ponderer=ponderer))
+        game.run()
+    finally:
+        ponderer.close()
 
     pygame.quit()
 
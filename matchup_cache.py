@@ -0,0 +1,254 @@
+import fcntl
+import hashlib
+import json
+import os
+import struct
+from collections import Counter, namedtuple
+from multiprocessing import Pool
+from card import all_cards, card_id
+from simulation import RULES_VERSION, make_policy, simulate, standard_decklists
+
+RESULT = struct.Struct("<qbbii")  # seed, winner (-1 for a draw), rounds, player points, ai points
+DRAW = -1
+LOCK_NAME = "cache.lock"
+CACHE_VERSION = 2  # Bump whenever the way a key's results are produced changes
+
+# margins counts games by total player points minus total AI points over all rounds
+MatchupSummary = namedtuple("MatchupSummary", ["games", "player_wins", "ai_wins", "draws", "margins", "simulated"])
+
+
+def matchup_key(player_cards, ai_cards, agents):
+    """
+    Fingerprint a pairing of decklists and agents.
+
+    Covers the card ids of both decklists (with each card's attributes, so a
+    card edited in card.py invalidates its results), both agents and their
+    configuration, and the rules and cache versions. Card order is not part
+    of the key (see MatchupCache.results), and neither are seeds: every seed
+    of a matchup is stored under it separately.
+
+    :param player_cards: Decklist of the player seat (Card objects).
+    :param ai_cards: Decklist of the AI seat (Card objects).
+    :param agents: ((name, config), (name, config)) for the player and AI seats.
+    :return: Hex digest.
+    """
+    def describe(cards):
+        return [[card_id(card), card.name, card.strength, card.row, card.ability, card.deck_type]
+                for card in sorted(cards, key=card_id)]
+
+    payload = json.dumps({
+        "rules": RULES_VERSION,
+        "cache": CACHE_VERSION,
+        "decks": [describe(player_cards), describe(ai_cards)],
+        "agents": [[name, config or {}] for name, config in agents],
+    }, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class MatchupCache:
+    def __init__(self, root, max_bytes=256 * 1024 * 1024):
+        """
+        On-disk cache of simulated match results.
+
+        Each matchup key has its own file of fixed-size per-seed records, so a
+        query for a seed range reads what is there and simulates only the
+        seeds that are missing. Writers append whole records under an
+        exclusive lock, so any number of processes can fill the cache at once.
+        When the cache grows past max_bytes, the matchups used least recently
+        are deleted.
+
+        :param root: Cache directory (created if missing).
+        :param max_bytes: Size the cache is trimmed back to.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        """Return the result file of a matchup key."""
+        return os.path.join(self.root, f"{key}.results")
+
+    def load(self, key):
+        """
+        Read every stored result of a matchup.
+        :param key: Key from matchup_key.
+        :return: Dictionary seed -> (winner, rounds, player points, ai points).
+        """
+        with self._locked(fcntl.LOCK_SH):
+            try:
+                with open(self.path(key), "rb") as results_file:
+                    data = results_file.read()
+            except FileNotFoundError:
+                return {}
+            os.utime(self.path(key))  # Mark as recently used for eviction
+        # A torn record can only be the last one; it is cut off by the next writer
+        data = data[:len(data) - len(data) % RESULT.size]
+        return {seed: result for seed, *result in RESULT.iter_unpack(data)}
+
+    def store(self, key, results):
+        """
+        Append results to a matchup.
+        :param key: Key from matchup_key.
+        :param results: Iterable of (seed, winner, rounds, player points, ai points).
+        """
+        data = b"".join(RESULT.pack(*result) for result in results)
+        if not data:
+            return
+        with self._locked(fcntl.LOCK_EX):
+            descriptor = os.open(self.path(key), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                size = os.fstat(descriptor).st_size
+                if size % RESULT.size:
+                    os.ftruncate(descriptor, size - size % RESULT.size)
+                os.write(descriptor, data)
+            finally:
+                os.close(descriptor)
+
+    def compact(self, key):
+        """
+        Rewrite a matchup's file without the duplicate seeds that concurrent writers can leave.
+        :param key: Key from matchup_key.
+        """
+        with self._locked(fcntl.LOCK_EX):
+            try:
+                with open(self.path(key), "rb") as results_file:
+                    data = results_file.read()
+            except FileNotFoundError:
+                return
+            data = data[:len(data) - len(data) % RESULT.size]
+            unique = {seed: result for seed, *result in RESULT.iter_unpack(data)}
+            temporary = f"{self.path(key)}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as results_file:
+                results_file.write(b"".join(RESULT.pack(seed, *result) for seed, result in sorted(unique.items())))
+            os.replace(temporary, self.path(key))
+
+    def results(self, player_cards, ai_cards, agents=(("rollout", None), ("rollout", None)), seeds=range(1000),
+                processes=None, chunk=200):
+        """
+        Get the results of a matchup over a seed range, simulating only what is not cached.
+
+        Decklists are dealt in card id order whatever order they are given in,
+        so the same cards always give the same results for a seed.
+
+        :param player_cards: Decklist of the player seat (Card objects).
+        :param ai_cards: Decklist of the AI seat (Card objects).
+        :param agents: ((name, config), (name, config)) for the two seats (see simulation.AGENTS).
+        :param seeds: Seeds to report on.
+        :param processes: Worker processes for missing seeds (1 simulates in this process).
+        :param chunk: Seeds per worker task.
+        :return: MatchupSummary.
+        """
+        key = matchup_key(player_cards, ai_cards, agents)
+        stored = self.load(key)
+        if os.path.exists(self.path(key)) and os.path.getsize(self.path(key)) > 2 * RESULT.size * len(stored):
+            self.compact(key)  # Mostly duplicates
+        missing = [seed for seed in seeds if seed not in stored]
+
+        if missing:
+            # The key ignores decklist order, so always deal from the same order
+            decklists = (sorted(map(card_id, player_cards)), sorted(map(card_id, ai_cards)))
+            tasks = [(self.root, key, decklists, tuple(agents), missing[start:start + chunk])
+                     for start in range(0, len(missing), chunk)]
+            if processes == 1:
+                for task in tasks:
+                    stored.update(_simulate_seeds(task))
+            else:
+                with Pool(processes) as pool:
+                    for batch in pool.imap_unordered(_simulate_seeds, tasks):
+                        stored.update(batch)
+            self.evict(keep=key)
+
+        summary = Counter()
+        margins = Counter()
+        for seed in seeds:
+            winner, _, player_points, ai_points = stored[seed]
+            summary[winner] += 1
+            margins[player_points - ai_points] += 1
+        return MatchupSummary(len(seeds), summary[0], summary[1], summary[DRAW], margins, len(missing))
+
+    def faction_results(self, player_faction, ai_faction, **options):
+        """
+        Get the results of the standard decklists of two factions; see results.
+        :param player_faction: Faction name of the player seat.
+        :param ai_faction: Faction name of the AI seat.
+        :return: MatchupSummary.
+        """
+        return self.results(*standard_decklists(player_faction, ai_faction), **options)
+
+    def size(self):
+        """Return the total size of the stored results in bytes."""
+        return sum(entry.stat().st_size for entry in os.scandir(self.root) if entry.name.endswith(".results"))
+
+    def evict(self, keep=None):
+        """
+        Delete the least recently used matchups until the cache fits in max_bytes.
+        :param keep: Key that is never deleted, e.g. the matchup being worked on.
+        """
+        with self._locked(fcntl.LOCK_EX):
+            entries = [entry for entry in os.scandir(self.root) if entry.name.endswith(".results")]
+            total = sum(entry.stat().st_size for entry in entries)
+            for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+                if total <= self.max_bytes:
+                    break
+                if entry.name == f"{keep}.results":
+                    continue
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+
+    def _locked(self, operation):
+        return _FileLock(os.path.join(self.root, LOCK_NAME), operation)
+
+
+class _FileLock:
+    def __init__(self, path, operation):
+        """Hold an flock on a file for the duration of a with block."""
+        self.path = path
+        self.operation = operation
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a")
+        fcntl.flock(self.file, self.operation)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+def _simulate_seeds(task):
+    """Worker entry point: simulate seeds, store them and return them."""
+    root, key, (player_ids, ai_ids), agents, seeds = task
+    decklists = ([all_cards[index] for index in player_ids], [all_cards[index] for index in ai_ids])
+    policies = [make_policy(name, config) for name, config in agents]
+    batch = {}
+    for seed in seeds:
+        result = simulate(seed, None, None, policies, decklists=decklists)
+        winner = DRAW if result.winner is None else result.winner
+        batch[seed] = (winner, len(result.rounds), sum(score[0] for score in result.rounds),
+                       sum(score[1] for score in result.rounds))
+    MatchupCache(root).store(key, [(seed, *result) for seed, result in batch.items()])
+    return batch
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Win rates of the standard faction decklists, cached on disk.")
+    parser.add_argument("root", help="Cache directory")
+    parser.add_argument("--seeds", type=int, default=2000)
+    parser.add_argument("--player-agent", default="rollout")
+    parser.add_argument("--ai-agent", default="rollout")
+    parser.add_argument("--processes", type=int, default=None)
+    arguments = parser.parse_args()
+
+    cache = MatchupCache(arguments.root)
+    agents = ((arguments.player_agent, None), (arguments.ai_agent, None))
+    for player_faction, ai_faction in (("Northern Realms", "Nilfgaardian Empire"),
+                                       ("Nilfgaardian Empire", "Northern Realms")):
+        started = time.perf_counter()
+        summary = cache.faction_results(player_faction, ai_faction, agents=agents,
+                                        seeds=range(arguments.seeds), processes=arguments.processes)
+        print(f"{player_faction} vs {ai_faction}: {summary.player_wins}-{summary.ai_wins}-{summary.draws} "
+              f"({summary.simulated} simulated, {time.perf_counter() - started:.2f}s)")
@@ -0,0 +1,333 @@
+import random
+
+# Move kinds. A move is a tuple whose first item is its kind:
+#   (PLAY, side, hand_index), (PASS, side), (LEADER, side), (REDRAW, side, hand_index), (END_ROUND,)
+PLAY = 0
+PASS = 1
+LEADER = 2
+REDRAW = 3
+END_ROUND = 4
+
+WEATHER_ABILITIES = ["frost", "fog", "rain"]
+
+
+def opponent_of(side):
+    """Return the other side ("player" or "ai")."""
+    return "ai" if side == "player" else "player"
+
+
+class GameState:
+    def __init__(self, board, player, ai, turn="player"):
+        """
+        A mutable game position that moves are applied to and undone on in place.
+
+        The state wraps the live Board and Player objects (and the players'
+        Decks) instead of copying them, so searching from a position allocates
+        nothing but the small undo tuples returned by apply.
+
+        :param board: The game board (Board object).
+        :param player: The human player (Player object).
+        :param ai: The AI player (Player object).
+        :param turn: The side to move ("player" or "ai").
+        """
+        self.board = board
+        self.players = {"player": player, "ai": ai}
+        self.turn = turn
+
+    def rows(self, side):
+        """
+        Get a side's rows.
+        :param side: "player" or "ai".
+        :return: Dictionary of row name -> Row.
+        """
+        return self.board.player_rows if side == "player" else self.board.ai_rows
+
+    def legal_moves(self, side=None):
+        """
+        List the moves available in the main phase of a round.
+        :param side: The side to list moves for (defaults to the side to move).
+        :return: List of move tuples.
+        """
+        side = side or self.turn
+        player = self.players[side]
+        if player.passed:
+            return []
+        moves = [(PLAY, side, index) for index in range(len(player.hand))]
+        moves.append((PASS, side))
+        if player.leader_card and not player.leader_used:
+            moves.append((LEADER, side))
+        return moves
+
+    def apply(self, move):
+        """
+        Apply a move, resolving any ability of a played card.
+        :param move: A move tuple.
+        :return: Undo record to pass to undo.
+        """
+        kind = move[0]
+        if kind == PLAY:
+            return self._play(move[1], move[2])
+        if kind == PASS:
+            player = self.players[move[1]]
+            record = (PASS, move[1], player.passed, self.turn)
+            player.pass_round()
+            self._advance_turn(move[1])
+            return record
+        if kind == LEADER:
+            player = self.players[move[1]]
+            record = (LEADER, move[1], player.leader_used, self.turn)
+            player.leader_used = True
+            self._advance_turn(move[1])
+            return record
+        if kind == REDRAW:
+            return self._redraw(move[1], move[2])
+        if kind == END_ROUND:
+            return self._end_round()
+        raise ValueError(f"Unknown move: {move}")
+
+    def undo(self, record):
+        """
+        Exactly reverse a move applied with apply.
+        :param record: The undo record returned by apply.
+        """
+        kind = record[0]
+        if kind == PLAY:
+            self._undo_play(record)
+        elif kind == PASS or kind == LEADER:
+            _, side, previous, turn = record
+            if kind == PASS:
+                self.players[side].passed = previous
+            else:
+                self.players[side].leader_used = previous
+            self.turn = turn
+        elif kind == REDRAW:
+            _, side, index, card = record
+            player = self.players[side]
+            player.deck.cards.insert(0, player.hand.pop())
+            player.hand.insert(index, card)
+        elif kind == END_ROUND:
+            self._undo_end_round(record)
+        else:
+            raise ValueError(f"Unknown undo record: {record}")
+
+    def _advance_turn(self, side):
+        opponent = opponent_of(side)
+        self.turn = side if self.players[opponent].passed else opponent
+
+    def _play(self, side, index):
+        player = self.players[side]
+        opponent = opponent_of(side)
+        turn = self.turn
+        card = player.hand.pop(index)
+        ability = (card.ability or "").lower()
+
+        # Spies land on the opponent's side; other units on their own row
+        placed_row = self.rows(opponent if ability == "spy" else side).get(card.row)
+        if placed_row is not None:
+            placed_row.add_card(card)
+
+        drawn = 0
+        scorched = None
+        resurrected_row = None
+        effect_rows = None
+        if ability == "spy":
+            drawn = min(2, len(player.deck.cards))
+            player.hand.extend(player.deck.cards[:drawn])
+            del player.deck.cards[:drawn]
+        elif ability == "scorch":
+            scorched = self._scorch()
+        elif ability == "medic":
+            if player.graveyard:
+                resurrected = player.graveyard.pop()
+                resurrected_row = self.rows(side).get(resurrected.row)
+                if resurrected_row is not None:
+                    resurrected_row.add_card(resurrected)
+                else:
+                    player.graveyard.append(resurrected)
+        elif ability in WEATHER_ABILITIES:
+            effect_rows = self._apply_effect("weather", opponent)
+        elif ability == "horn":
+            effect_rows = self._apply_effect("horn", side)
+        elif ability == "clear":
+            effect_rows = self._clear_weather()
+
+        self._advance_turn(side)
+        return (PLAY, side, index, card, placed_row, drawn, scorched, resurrected_row, ability, effect_rows, turn)
+
+    def _undo_play(self, record):
+        _, side, index, card, placed_row, drawn, scorched, resurrected_row, ability, effect_rows, turn = record
+        player = self.players[side]
+        self.turn = turn
+
+        if ability in WEATHER_ABILITIES or ability == "horn":
+            effect = "horn" if ability == "horn" else "weather"
+            for row in effect_rows:
+                row.effects.remove(effect)
+        elif ability == "clear":
+            for row, position in reversed(effect_rows):
+                row.effects.insert(position, "weather")
+        elif resurrected_row is not None:
+            player.graveyard.append(resurrected_row.cards.pop())
+        elif scorched is not None:
+            for owner, row, position, removed in reversed(scorched):
+                self.players[owner].graveyard.pop()
+                row.cards.insert(position, removed)
+        elif drawn:
+            player.deck.cards[0:0] = player.hand[-drawn:]
+            del player.hand[-drawn:]
+
+        if placed_row is not None:
+            placed_row.cards.pop()
+        player.hand.insert(index, card)
+
+    def _scorch(self):
+        """Remove the strongest units on each side, as Board.scorch_highest_units does."""
+        scorched = []
+        for side in ("player", "ai"):
+            rows = self.rows(side)
+            max_strength = max(
+                (card.strength for row in rows.values() for card in row.cards if card.strength), default=0
+            )
+            for row in rows.values():
+                position = 0
+                while position < len(row.cards):
+                    card = row.cards[position]
+                    if card.strength == max_strength:
+                        scorched.append((side, row, position, card))
+                        del row.cards[position]
+                        self.players[side].graveyard.append(card)
+                    else:
+                        position += 1
+        return scorched
+
+    def _apply_effect(self, effect, side):
+        changed = []
+        for row in self.rows(side).values():
+            if effect not in row.effects:
+                row.apply_effect(effect)
+                changed.append(row)
+        return changed
+
+    def _clear_weather(self):
+        cleared = []
+        for side in ("player", "ai"):
+            for row in self.rows(side).values():
+                if "weather" in row.effects:
+                    cleared.append((row, row.effects.index("weather")))
+                    row.remove_effect("weather")
+        return cleared
+
+    def _redraw(self, side, index):
+        player = self.players[side]
+        card = player.hand.pop(index)
+        player.hand.append(player.deck.cards.pop(0))  # The replaced card is discarded, as in Game.redraw_phase
+        return (REDRAW, side, index, card)
+
+    def _end_round(self):
+        player_score = self.board.calculate_total_score("player")
+        ai_score = self.board.calculate_total_score("ai")
+        loser = None
+        if player_score > ai_score:
+            loser = "ai"
+        elif ai_score > player_score:
+            loser = "player"
+        if loser:
+            self.players[loser].health -= 1
+
+        # Swap in empty lists instead of copying, so undo can put the old ones back
+        rows = []
+        for side in ("player", "ai"):
+            player = self.players[side]
+            graveyard_size = len(player.graveyard)
+            for row in self.rows(side).values():
+                player.graveyard.extend(row.cards)
+                rows.append((row, row.cards, row.effects))
+                row.cards = []
+                row.effects = []
+            rows.append((side, graveyard_size, player.passed, player.total_score))
+            player.reset_round()
+        return (END_ROUND, loser, rows, self.turn)
+
+    def _undo_end_round(self, record):
+        _, loser, rows, turn = record
+        for item in rows:
+            if isinstance(item[0], str):
+                side, graveyard_size, passed, total_score = item
+                player = self.players[side]
+                del player.graveyard[graveyard_size:]
+                player.passed = passed
+                player.total_score = total_score
+            else:
+                row, cards, effects = item
+                row.cards = cards
+                row.effects = effects
+        if loser:
+            self.players[loser].health += 1
+        self.turn = turn
+
+
+def snapshot(state):
+    """
+    Capture every field moves can change, for comparing states.
+    :param state: A GameState.
+    :return: Nested tuples of card identities and scalar fields.
+    """
+    sides = []
+    for side in ("player", "ai"):
+        player = state.players[side]
+        sides.append((
+            tuple(map(id, player.hand)),
+            tuple(map(id, player.deck.cards)),
+            tuple(map(id, player.graveyard)),
+            player.passed, player.leader_used, player.health, player.total_score,
+            tuple((name, tuple(map(id, row.cards)), tuple(row.effects)) for name, row in state.rows(side).items()),
+        ))
+    return state.turn, tuple(sides)
+
+
+def random_move(state, rng):
+    """Pick a random move, including redraws and round ends, for exercising apply and undo."""
+    side = rng.choice(["player", "ai"])
+    player = state.players[side]
+    choices = state.legal_moves(side) + [(END_ROUND,)]
+    if player.hand and player.deck.cards:
+        choices.append((REDRAW, side, rng.randrange(len(player.hand))))
+    return rng.choice(choices)
+
+
+if __name__ == "__main__":
+    # Property check: random move sequences, undone in reverse, restore every field
+    from card import northern_realms_deck, nilfgaardian_deck, neutral_deck, special_cards
+    from board import Board
+    from deck import Deck
+    from player import Player
+
+    rng = random.Random(0)
+    for trial in range(500):
+        random.seed(trial)
+        player = Player("Player", "Northern Realms",
+                        Deck("Northern Realms", list(northern_realms_deck), neutral_deck[:5], special_cards[:4]))
+        ai = Player("AI Opponent", "Nilfgaardian Empire",
+                    Deck("Nilfgaardian Empire", list(nilfgaardian_deck), neutral_deck[5:10], special_cards[3:]),
+                    leader_card=nilfgaardian_deck[15])
+        player.draw_initial_hand()
+        ai.draw_initial_hand()
+        state = GameState(Board(), player, ai)
+
+        history = []
+        for _ in range(rng.randrange(1, 60)):
+            before = snapshot(state)
+            move = random_move(state, rng)
+            record = state.apply(move)
+            history.append((before, move, record))
+
+            # Apply-then-undo of a single move is an identity...
+            state.undo(record)
+            assert snapshot(state) == before, f"trial {trial}: undo of {move} changed the state"
+            history[-1] = (before, move, state.apply(move))
+
+        # ...and so is unwinding the whole line
+        for before, move, record in reversed(history):
+            state.undo(record)
+            assert snapshot(state) == before, f"trial {trial}: unwinding {move} changed the state"
+    print("apply/undo restored every field in 500 random games")
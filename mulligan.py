@@ -0,0 +1,216 @@
+from functools import lru_cache
+from itertools import combinations
+
+HAND_SIZE = 10  # Cards in the opening hand (Player.draw_initial_hand)
+MAX_REDRAWS = 2  # Cards that may be replaced in the redraw phase
+
+# Rough worth of special cards in points, since they have no strength of their own
+SPECIAL_VALUES = {"scorch": 6, "horn": 6, "frost": 4, "fog": 4, "rain": 4, "clear": 2, "decoy": 3}
+
+
+@lru_cache(maxsize=None)
+def hypergeometric(population, successes, draws):
+    """
+    Probability of each number of successes when drawing without replacement.
+    :param population: Number of cards drawn from.
+    :param successes: Number of those cards that count as a success.
+    :param draws: Number of cards drawn.
+    :return: Tuple whose j-th entry is the probability of exactly j successes.
+    """
+    draws = min(draws, population)
+    total = _choose(population, draws)
+    return tuple(_choose(successes, hits) * _choose(population - successes, draws - hits) / total
+                 for hits in range(draws + 1))
+
+
+def _choose(n, k):
+    if k < 0 or k > n:
+        return 0
+    result = 1
+    for index in range(k):
+        result = result * (n - index) // (index + 1)
+    return result
+
+
+class MulliganTables:
+    def __init__(self, cards, hand_size=HAND_SIZE, max_redraws=MAX_REDRAWS):
+        """
+        Per-deck tables for judging redraws without simulating anything.
+
+        Every card gets a standalone value: units their strength, specials a
+        fixed estimate, spies the two cards they draw minus the strength they
+        hand to the opponent, and medics their strength plus the average unit
+        they can bring back. Tight Bond copies are worth extra together, and
+        the chance of drawing into a bond is read from hypergeometric tables
+        built here, so a decision only adds up table entries for the hand.
+
+        :param cards: Full decklist (list of Card objects) before any draws.
+        :param hand_size: Cards in the opening hand.
+        :param max_redraws: Cards that may be replaced.
+        """
+        self.max_redraws = max_redraws
+        self.deck_size = len(cards)
+        self.pool_size = max(0, self.deck_size - hand_size)
+
+        base = {card.name: _base_value(card) for card in cards}
+        units = [card for card in cards if card.strength is not None]
+        # Medics bring back ordinary units; heroes and spies are not worth targeting
+        targets = [card.strength for card in units if _ability(card) not in ("hero", "hero medic", "spy", "medic")]
+        target_value = sum(targets) / len(targets) if targets else 0.0
+        draw_value = sum(base[card.name] for card in cards) / len(cards) if cards else 0.0
+
+        self.values = {}  # name -> standalone value of one copy
+        for card in cards:
+            ability = _ability(card)
+            value = base[card.name]
+            if ability == "spy":
+                value = 2 * draw_value - (card.strength or 0)
+            elif ability == "medic":
+                # Only an exact Medic revives, in the game and in the simulator;
+                # a Hero Medic is valued as the plain hero it plays as
+                value += target_value
+            self.values[card.name] = value
+        self.total_value = sum(self.values[card.name] for card in cards)
+
+        # Tight Bond groups with more than one copy: name -> (copies in deck, strength)
+        self.bonds = {}
+        for card in cards:
+            if _ability(card) == "tight bond":
+                copies, strength = self.bonds.get(card.name, (0, card.strength or 0))
+                self.bonds[card.name] = (copies + 1, strength)
+        self.bonds = {name: group for name, group in self.bonds.items() if group[0] > 1}
+
+        # (copies left in the pool, cards drawn) -> distribution of copies drawn
+        self.bond_draws = {
+            (left, draws): hypergeometric(self.pool_size, left, draws)
+            for copies, _ in self.bonds.values()
+            for left in range(copies + 1)
+            for draws in range(1, max_redraws + 1)
+        }
+
+    def hand_value(self, hand):
+        """
+        Value a hand, including bonuses for Tight Bond copies held together.
+        :param hand: List of Card objects.
+        :return: Hand value in points.
+        """
+        value = sum(self.values.get(card.name, 0.0) for card in hand)
+        for name, (_, strength) in self.bonds.items():
+            held = sum(1 for card in hand if card.name == name)
+            value += strength * held * (held - 1)  # n bonded copies are each worth n times their strength
+        return value
+
+    def expected_value(self, hand, replaced):
+        """
+        Expected value of a hand after replacing some of its cards.
+
+        Replaced cards are discarded, so the new cards come from the rest of
+        the decklist, which at the redraw phase is the decklist minus the hand.
+
+        :param hand: The opening hand (list of Card objects).
+        :param replaced: Indices of the cards to replace.
+        :return: Expected hand value in points.
+        """
+        draws = len(replaced)
+        kept = [card for index, card in enumerate(hand) if index not in replaced]
+        if not draws:
+            return self.hand_value(kept)
+
+        pool_value = self.total_value - sum(self.values.get(card.name, 0.0) for card in hand)
+        value = sum(self.values.get(card.name, 0.0) for card in kept) + draws * pool_value / max(1, self.pool_size)
+        for name, (copies, strength) in self.bonds.items():
+            held = sum(1 for card in kept if card.name == name)
+            left = copies - sum(1 for card in hand if card.name == name)
+            for drawn, chance in enumerate(self.bond_draws[(left, draws)]):
+                total = held + drawn
+                value += chance * strength * total * (total - 1)
+        return value
+
+    def replacement_values(self, hand):
+        """
+        Expected value of the hand after replacing each single card.
+        :param hand: The opening hand (list of Card objects).
+        :return: List of expected hand values, one per card.
+        """
+        return [self.expected_value(hand, (index,)) for index in range(len(hand))]
+
+    def best_redraw(self, hand, max_redraws=None):
+        """
+        Pick the cards whose replacement raises the expected hand value the most.
+        :param hand: The opening hand (list of Card objects).
+        :param max_redraws: Cards that may be replaced (defaults to the table's limit).
+        :return: (indices to replace, expected gain in points); no indices means keep the hand.
+        """
+        limit = self.max_redraws if max_redraws is None else min(max_redraws, self.max_redraws)
+        values = [self.values.get(card.name, 0.0) for card in hand]
+        draw_value = (self.total_value - sum(values)) / max(1, self.pool_size)
+        # Gain of replacing each card on its own, ignoring bonds
+        gains = [draw_value - value for value in values]
+        if not self.bonds:
+            # Gains simply add up, so the best redraw is the cards with the largest positive gains
+            ranked = sorted((index for index in range(len(hand)) if gains[index] > 1e-9),
+                            key=gains.__getitem__, reverse=True)[:limit]
+            return sorted(ranked), sum(gains[index] for index in ranked)
+
+        bonded = {index: card.name for index, card in enumerate(hand) if card.name in self.bonds}
+        held = {name: sum(1 for card in hand if card.name == name) for name in self.bonds}
+
+        best, best_gain = (), 0.0
+        for draws in range(1, limit + 1):
+            for replaced in combinations(range(len(hand)), draws):
+                gain = sum(gains[index] for index in replaced)
+                for name, (copies, strength) in self.bonds.items():
+                    before = held[name]
+                    kept = before - sum(1 for index in replaced if bonded.get(index) == name)
+                    expected = 0.0
+                    for drawn, chance in enumerate(self.bond_draws[(copies - before, draws)]):
+                        expected += chance * (kept + drawn) * (kept + drawn - 1)
+                    gain += strength * (expected - before * (before - 1))
+                if gain > best_gain + 1e-9:
+                    best, best_gain = replaced, gain
+        return list(best), best_gain
+
+def _ability(card):
+    return (card.ability or "").lower()
+
+
+def _base_value(card):
+    if card.strength is not None:
+        return card.strength
+    return SPECIAL_VALUES.get(_ability(card), 0)
+
+
+if __name__ == "__main__":
+    # Compare the advisor against brute-force averages over every possible redraw
+    import random
+    import time
+    from card import Card, northern_realms_deck, nilfgaardian_deck, neutral_deck, special_cards
+
+    rng = random.Random(7)
+    bonded = [Card("Bonded Guard", 3, "close", "Tight Bond") for _ in range(3)]
+    decklists = [
+        northern_realms_deck + neutral_deck[:5] + special_cards[:3],
+        nilfgaardian_deck + neutral_deck[5:10] + special_cards[3:6],
+        northern_realms_deck[:20] + bonded,
+    ]
+    for cards in decklists:
+        tables = MulliganTables(cards)
+        for _ in range(50):
+            shuffled = cards[:]
+            rng.shuffle(shuffled)
+            hand, pool = shuffled[:HAND_SIZE], shuffled[HAND_SIZE:]
+            for replaced in [(0,), (1, 2), (3,)]:
+                kept = [card for index, card in enumerate(hand) if index not in replaced]
+                outcomes = [tables.hand_value(kept + list(drawn)) for drawn in combinations(pool, len(replaced))]
+                exact = sum(outcomes) / len(outcomes)
+                assert abs(exact - tables.expected_value(hand, replaced)) < 1e-6, (exact, replaced)
+            indices, gain = tables.best_redraw(hand)
+            candidates = [()] + [replaced for draws in (1, 2) for replaced in combinations(range(HAND_SIZE), draws)]
+            brute = max(tables.expected_value(hand, replaced) for replaced in candidates) - tables.hand_value(hand)
+            assert abs(gain - brute) < 1e-6 and abs(tables.expected_value(hand, indices) - tables.hand_value(hand) - gain) < 1e-6
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            tables.best_redraw(hand)
+        elapsed = (time.perf_counter() - started) / 1000
+        print(f"{len(cards)} cards: best redraw {tables.best_redraw(hand)} in {elapsed * 1e6:.0f} us")
@@ -0,0 +1,346 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from multiprocessing import Pool
+from bitboard import STRENGTH, ids_of
+from card import all_cards
+from records import FACTIONS
+from search import PASS_MOVE
+from simulation import RULES_VERSION, make_policy, simulate, standard_decklists
+
+BOOK_VERSION = 1
+BOOK_PLIES = 4  # Moves at the start of the first round covered by the book, counting both sides
+MIN_VISITS = 8  # Least number of simulated games behind a move before it goes into the book
+
+# File layout: a header followed by an open-addressing hash table of fixed-size slots.
+# A slot with key 0 is empty; keys are never 0 (see state_key).
+HEADER = struct.Struct("<4sHHQ16sQ")  # magic, version, reserved, capacity, fingerprint, games
+SLOT = struct.Struct("<QHHII")  # key, move, reserved, visits, wins (in half points)
+MAGIC = b"GWOB"
+
+
+KINDS = ["spy", "medic", "hero", "bond", "weather", "special", "high", "mid", "low"]
+MAX_COUNT = 2  # Counts of a kind above this are treated alike
+
+
+def _kind(card):
+    ability = (card.ability or "").lower()
+    if ability == "spy":
+        return "spy"
+    if ability == "medic":
+        return "medic"
+    if ability.startswith("hero"):
+        return "hero"
+    if ability == "tight bond":
+        return "bond"
+    if ability in ("frost", "fog", "rain"):
+        return "weather"
+    if card.strength is None:
+        return "special"
+    return "high" if card.strength >= 6 else ("mid" if card.strength >= 3 else "low")
+
+
+# Early positions are keyed by what kinds of cards are where, not by exact cards,
+# so the same book entry serves every deal with the same shape
+KIND_OF = [KINDS.index(_kind(card)) for card in all_cards]
+PASS_KIND = 0xFFFF
+
+
+def composition(mask):
+    """
+    Canonical form of a card set: how many cards of each kind it holds.
+    :param mask: Integer bitmask over card ids.
+    :return: Tuple of counts per KINDS entry, capped at MAX_COUNT.
+    """
+    counts = [0] * len(KINDS)
+    for card in ids_of(mask):
+        counts[KIND_OF[card]] += 1
+    return tuple(min(count, MAX_COUNT) for count in counts)
+
+
+def state_key(state, side, went_first):
+    """
+    Hash the early-game position a side is looking at.
+
+    The key covers what the side knows: the composition of its hand and of
+    both boards, row effects, who has passed and whether it went first
+    after the coin toss.
+
+    :param state: The BitState.
+    :param side: The side to move.
+    :param went_first: Whether that side moved first in the match.
+    :return: Nonzero 64-bit key.
+    """
+    opponent = 1 - side
+    canonical = (
+        went_first,
+        composition(state.hands[side]),
+        composition(state.board(side)),
+        composition(state.board(opponent)),
+        state.weather[side], state.weather[opponent], state.horn[side], state.horn[opponent],
+        state.passed[side], state.passed[opponent],
+    )
+    digest = hashlib.blake2b(repr(canonical).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+def move_kind(move):
+    """Return the kind of a move id (PASS_KIND for a pass)."""
+    return PASS_KIND if move == PASS_MOVE else KIND_OF[move]
+
+
+def matchup_fingerprint(player_faction, ai_faction):
+    """
+    Fingerprint everything a matchup's book depends on.
+
+    It changes whenever a card in either decklist changes in card.py, when
+    the simulated rules change and when the book format changes.
+
+    :param player_faction: Faction name of the player seat.
+    :param ai_faction: Faction name of the AI seat.
+    :return: 16-byte digest.
+    """
+    decklists = [[(card.name, card.strength, card.row, card.ability, card.deck_type) for card in cards]
+                 for cards in standard_decklists(player_faction, ai_faction)]
+    payload = json.dumps([BOOK_VERSION, RULES_VERSION, BOOK_PLIES, KINDS, MAX_COUNT, decklists])
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+
+def book_name(player_faction, ai_faction):
+    """Return the file name of a matchup's book."""
+    slug = "-".join(faction.lower().replace(" ", "_") for faction in (player_faction, ai_faction))
+    return f"book-{slug}.bin"
+
+
+class OpeningBook:
+    def __init__(self, path):
+        """
+        Open a matchup's book for probing.
+
+        The file is memory-mapped read-only; a probe hashes the position and
+        looks at a handful of neighbouring slots, so it costs the same no
+        matter how large the book is.
+
+        :param path: Path of a book file written by write_book.
+        """
+        self.path = path
+        with open(path, "rb") as book_file:
+            self.map = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.capacity, self.fingerprint, self.games = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != BOOK_VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {BOOK_VERSION} opening book.")
+        self.mask = self.capacity - 1
+
+    def lookup(self, key):
+        """
+        Find the stored move for a position key.
+        :param key: Key from state_key.
+        :return: (move kind, visits, wins) or None if the position is not in the book.
+        """
+        index = key & self.mask
+        while True:
+            slot_key, move, _, visits, wins = SLOT.unpack_from(self.map, HEADER.size + index * SLOT.size)
+            if slot_key == key:
+                return move, visits, wins
+            if slot_key == 0:
+                return None
+            index = (index + 1) & self.mask
+
+    def probe(self, state, side, went_first):
+        """
+        Get the book move for a position.
+        :param state: The BitState.
+        :param side: The side to move.
+        :param went_first: Whether that side moved first in the match.
+        :return: Card id from the side's hand, PASS_MOVE, or None if out of book.
+        """
+        entry = self.lookup(state_key(state, side, went_first))
+        if entry is None:
+            return None
+        if entry[0] == PASS_KIND:
+            return PASS_MOVE
+        candidates = [card for card in ids_of(state.hands[side]) if KIND_OF[card] == entry[0]]
+        if not candidates:
+            return None
+        # Spies strengthen the opponent, so give away the weakest; otherwise play the strongest
+        pick = min if entry[0] == KINDS.index("spy") else max
+        return pick(candidates, key=STRENGTH.__getitem__)
+
+    def close(self):
+        """Release the memory map."""
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def open_book(root, player_faction, ai_faction):
+    """
+    Open a matchup's book if one was built for the current decklists.
+    :param root: Book directory.
+    :param player_faction: Faction name of the player seat.
+    :param ai_faction: Faction name of the AI seat.
+    :return: OpeningBook, or None if there is no up-to-date book.
+    """
+    path = os.path.join(root, book_name(player_faction, ai_faction))
+    if not os.path.exists(path):
+        return None
+    book = OpeningBook(path)
+    if book.fingerprint != matchup_fingerprint(player_faction, ai_faction):
+        book.close()
+        return None
+    return book
+
+
+def write_book(path, fingerprint, games, stats, min_visits=MIN_VISITS):
+    """
+    Write the best move of every well-sampled position to a book file.
+
+    The file is written next to its final path and then renamed into place,
+    so controllers holding the old book keep a consistent mapping.
+
+    :param path: Book file path.
+    :param fingerprint: Matchup fingerprint.
+    :param games: Number of simulated games behind the statistics.
+    :param stats: Dictionary key -> {move kind: [visits, wins]}.
+    :param min_visits: Least visits for a move to be stored.
+    """
+    entries = []
+    for key, moves in stats.items():
+        sampled = [(wins / visits, move, visits, wins) for move, (visits, wins) in moves.items()
+                   if visits >= min_visits]
+        if sampled:
+            _, move, visits, wins = max(sampled)
+            entries.append((key, move, visits, wins))
+
+    capacity = 16
+    while capacity < 2 * len(entries):  # Keep the table at most half full
+        capacity *= 2
+    table = bytearray(HEADER.size + capacity * SLOT.size)
+    HEADER.pack_into(table, 0, MAGIC, BOOK_VERSION, 0, capacity, fingerprint, games)
+    for key, move, visits, wins in entries:
+        index = key & (capacity - 1)
+        while SLOT.unpack_from(table, HEADER.size + index * SLOT.size)[0]:
+            index = (index + 1) & (capacity - 1)
+        SLOT.pack_into(table, HEADER.size + index * SLOT.size, key, move, 0, visits, wins)
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as book_file:
+        book_file.write(table)
+    os.replace(temporary, path)
+
+
+def _collect(task):
+    """Worker entry point: simulate a range of seeds and count early moves."""
+    player_faction, ai_faction, seeds, agents = task
+    policies = [make_policy(agent) for agent in agents]
+    stats = {}
+
+    for seed in seeds:
+        seen = []
+        first = []
+
+        def observe(state, side, move, round_number, ply):
+            if round_number == 1 and ply < BOOK_PLIES:
+                if ply == 0:
+                    first.append(side)  # Whoever moves first won the coin toss
+                seen.append((side, state_key(state, side, side == first[0]), move_kind(move)))
+
+        result = simulate(seed, player_faction, ai_faction, policies, observer=observe)
+        for side, key, move in seen:
+            counts = stats.setdefault(key, {}).setdefault(move, [0, 0])
+            counts[0] += 1
+            counts[1] += 2 if result.winner == side else (1 if result.winner is None else 0)
+    return stats
+
+
+def _merge(stats, update):
+    for key, moves in update.items():
+        target = stats.setdefault(key, {})
+        for move, (visits, wins) in moves.items():
+            counts = target.setdefault(move, [0, 0])
+            counts[0] += visits
+            counts[1] += wins
+
+
+def build_books(root, games, agents=("rollout", "rollout"), matchups=None, processes=None, chunk=500):
+    """
+    Build or extend the opening books of every faction matchup.
+
+    Simulation statistics are kept next to each book. A matchup whose
+    decklists are unchanged continues from its saved statistics and only
+    simulates the games it is still missing; a matchup whose fingerprint
+    changed starts over. Matchups already at the target are left alone.
+
+    :param root: Book directory (created if missing).
+    :param games: Target number of simulated games per matchup.
+    :param agents: Agent names (see simulation.AGENTS) for the two seats.
+    :param matchups: List of (player_faction, ai_faction); defaults to every pairing of FACTIONS.
+    :param processes: Number of worker processes.
+    :param chunk: Seeds per worker task.
+    :return: Dictionary matchup -> games simulated in this run.
+    """
+    os.makedirs(root, exist_ok=True)
+    matchups = matchups or [(player, ai) for player in FACTIONS for ai in FACTIONS]
+    simulated = {}
+    with Pool(processes) as pool:
+        for player_faction, ai_faction in matchups:
+            path = os.path.join(root, book_name(player_faction, ai_faction))
+            fingerprint = matchup_fingerprint(player_faction, ai_faction)
+            stats, done = _load_stats(path + ".stats", fingerprint)
+            simulated[(player_faction, ai_faction)] = max(0, games - done)
+            if done >= games:
+                continue
+
+            tasks = [(player_faction, ai_faction, range(start, min(start + chunk, games)), tuple(agents))
+                     for start in range(done, games, chunk)]
+            for update in pool.imap_unordered(_collect, tasks):
+                _merge(stats, update)
+            _save_stats(path + ".stats", fingerprint, games, stats)
+            write_book(path, fingerprint, games, stats)
+    return simulated
+
+
+def _load_stats(path, fingerprint):
+    try:
+        with open(path) as stats_file:
+            saved = json.load(stats_file)
+    except (OSError, ValueError):
+        return {}, 0
+    if saved.get("fingerprint") != fingerprint.hex():
+        return {}, 0
+    stats = {}
+    for key, move, visits, wins in saved["entries"]:
+        stats.setdefault(key, {})[move] = [visits, wins]
+    return stats, saved["games"]
+
+
+def _save_stats(path, fingerprint, games, stats):
+    entries = [[key, move, visits, wins] for key, moves in stats.items()
+               for move, (visits, wins) in moves.items()]
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as stats_file:
+        json.dump({"fingerprint": fingerprint.hex(), "games": games, "entries": entries}, stats_file)
+    os.replace(temporary, path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build opening books from simulated play.")
+    parser.add_argument("root", help="Book directory")
+    parser.add_argument("--games", type=int, default=20000, help="Simulated games per matchup")
+    parser.add_argument("--processes", type=int, default=None)
+    arguments = parser.parse_args()
+
+    for (player_faction, ai_faction), count in build_books(arguments.root, arguments.games,
+                                                           processes=arguments.processes).items():
+        with open_book(arguments.root, player_faction, ai_faction) as book:
+            print(f"{player_faction} vs {ai_faction}: simulated {count} games, "
+                  f"book holds {book.games} games in {book.capacity} slots")
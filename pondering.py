@@ -0,0 +1,204 @@
+import random
+import time
+from array import array
+from multiprocessing import Event, Lock, Process, Value
+from multiprocessing.shared_memory import SharedMemory
+from bitboard import ids_of
+from search import NUM_MOVES, PASS_MOVE, STATE_SIZE, apply_move, decode_state, determinize, encode_state, search_root
+from simulation import rollout_policy
+
+STOP = -1  # Generation value that shuts the worker down
+
+
+def public_key(state):
+    """
+    The part of a state the AI can see, which a pondered reply must reproduce.
+    :param state: The BitState.
+    :return: Hashable tuple.
+    """
+    return (tuple(state.rows[0]), tuple(state.rows[1]), tuple(state.weather), tuple(state.horn),
+            tuple(state.passed), state.hands[1], tuple(state.health))
+
+
+def likely_replies(state, rng, samples=64):
+    """
+    Estimate how likely each reply of the player is, without looking at the player's hand.
+    :param state: The BitState with the player to move.
+    :param rng: random.Random driving the samples.
+    :param samples: Number of dealt hands to sample.
+    :return: Dictionary move id -> weight.
+    """
+    if not state.hands[0]:
+        return {PASS_MOVE: 1.0}
+    weights = {move: 0.5 for move in ids_of(state.hands[0] | state.decks[0])}
+    weights[PASS_MOVE] = 0.5
+    for _ in range(samples):
+        sample = state.copy()
+        determinize(sample, 1, rng)
+        weights[rollout_policy(sample, 0, rng)] += 1
+    return weights
+
+
+def reply_position(state, move, rng):
+    """
+    Deal the player a hand holding a reply and play it.
+    :param state: The BitState with the player to move.
+    :param move: The player's reply.
+    :param rng: random.Random used for the deal.
+    :return: (BitState after the reply, side to move next).
+    """
+    child = state.copy()
+    determinize(child, 1, rng)
+    if move != PASS_MOVE and not child.hands[0] >> move & 1:
+        # Swap the reply into the dealt hand in place of a random card
+        swapped = rng.choice(list(ids_of(child.hands[0])))
+        child.hands[0] ^= (1 << swapped) | (1 << move)
+        child.decks[0] ^= (1 << swapped) | (1 << move)
+    return child, apply_move(child, 0, move, rng)
+
+
+def _ponder(root_name, stats_name, generation, lock, go, batch):
+    """Worker process: search the AI's answer to every likely reply until told to stop."""
+    root_block = SharedMemory(root_name)
+    stats_block = SharedMemory(stats_name)
+    root = root_block.buf.cast("q")
+    stats = stats_block.buf.cast("q")
+    while True:
+        go.wait()  # Cleared while the player is not to move
+        with lock:
+            current = generation.value
+            state = decode_state(root)
+        if current == STOP:
+            break
+        rng = random.Random()
+        weights = likely_replies(state, rng)
+        visits = {move: [0] * NUM_MOVES for move in weights}
+        wins = {move: [0] * NUM_MOVES for move in weights}
+        totals = dict.fromkeys(weights, 0)
+
+        while generation.value == current and any(weights.values()):
+            # Spend the next batch on the reply that is most under-searched for its likelihood
+            move = max(weights, key=lambda reply: weights[reply] / (1 + totals[reply]))
+            child, side = reply_position(state, move, rng)
+            totals[move] += batch
+            if side != 1:
+                weights[move] = 0.0  # The AI would not move after this reply
+                continue
+            search_root(child, 1, batch, rng, visits[move], wins[move])
+            with lock:
+                if generation.value != current:
+                    break
+                base = move * NUM_MOVES * 2
+                stats[base:base + NUM_MOVES] = memoryview(array("q", visits[move]))
+                stats[base + NUM_MOVES:base + 2 * NUM_MOVES] = memoryview(array("q", wins[move]))
+        while generation.value == current:
+            time.sleep(0.01)  # Nothing left to search until the next position
+
+    root.release()
+    stats.release()
+    root_block.close()
+    stats_block.close()
+
+
+class Ponderer:
+    def __init__(self, batch=16):
+        """
+        Search the AI's answers in a background process during the player's turn.
+
+        While the player thinks, the worker samples which cards the player is
+        likely to play (it never looks at the player's actual hand) and runs
+        batches of rollouts for the AI's reply to each, most likely first.
+        When the player moves, the statistics for that move are kept and the
+        rest are discarded; the AI's search then starts from them.
+
+        Replies are replayed with BitState.play, and the AI only uses the
+        statistics if that gives the position it actually faces. Game and
+        AIController resolve some cards differently (a spy is placed on both
+        sides, and weather abilities are lowercase in card.py but matched
+        capitalized), so after such a reply the pondered work is dropped and
+        the AI searches from scratch as it would without a ponderer.
+
+        Stopping bumps a shared counter under a lock that the worker only holds
+        while copying out its counts, so it never waits for a batch to finish.
+
+        :param batch: Rollouts per batch; the worker checks for cancellation between batches.
+        """
+        self.root_block = SharedMemory(create=True, size=8 * STATE_SIZE)
+        self.stats_block = SharedMemory(create=True, size=8 * NUM_MOVES * NUM_MOVES * 2)
+        self.root = self.root_block.buf.cast("q")
+        self.stats = self.stats_block.buf.cast("q")
+        self.generation = Value("q", 0, lock=False)
+        self.lock = Lock()
+        self.go = Event()
+        self.process = Process(target=_ponder, daemon=True,
+                               args=(self.root_block.name, self.stats_block.name, self.generation,
+                                     self.lock, self.go, batch))
+        self.process.start()
+        self.root_state = None
+        self.kept = None  # (expected public key, visits, wins) of the reply that was played
+
+    def start(self, state):
+        """
+        Start pondering while the player is to move.
+        :param state: BitState with the player to move.
+        """
+        with self.lock:
+            encode_state(state, self.root)
+            self.stats_block.buf[:len(self.stats) * 8] = bytes(len(self.stats) * 8)
+            self.generation.value += 1
+        self.root_state = state.copy()
+        self.kept = None
+        self.go.set()
+
+    def stop(self, move):
+        """
+        Stop pondering because the player moved, keeping the statistics for that move.
+        :param move: The player's move (card id or PASS_MOVE).
+        """
+        if self.root_state is None:
+            return
+        self.go.clear()
+        with self.lock:
+            self.generation.value += 1
+            base = move * NUM_MOVES * 2
+            visits = self.stats[base:base + NUM_MOVES].tolist()
+            wins = self.stats[base + NUM_MOVES:base + 2 * NUM_MOVES].tolist()
+        expected, _ = reply_position(self.root_state, move, random.Random())
+        self.kept = (public_key(expected), visits, wins) if any(visits) else None
+        self.root_state = None
+
+    def take(self, state):
+        """
+        Hand over the pondered statistics if they match the position the AI is in.
+
+        They do not match after replies the game resolves differently from
+        BitState.play, such as spies and weather (see Ponderer).
+
+        :param state: BitState with the AI to move.
+        :return: (visits, wins) lists indexed by move id, or (None, None).
+        """
+        kept, self.kept = self.kept, None
+        if kept is None or kept[0] != public_key(state):
+            return None, None
+        return kept[1], kept[2]
+
+    def close(self):
+        """
+        Stop the worker and free the shared memory.
+        """
+        self.generation.value = STOP
+        self.go.set()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.root.release()
+        self.stats.release()
+        for block in (self.root_block, self.stats_block):
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
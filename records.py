@@ -0,0 +1,364 @@
+import json
+import mmap
+import os
+import socket
+import sys
+import uuid
+from array import array
+from card import card_id
+
+FACTIONS = ["Northern Realms", "Nilfgaardian Empire"]
+SIDES = ["player", "ai"]
+NO_CARD = -1  # Card column value for a pass
+TIE = -1  # Winner column value for a drawn game
+FORMAT_VERSION = 1
+
+# Table layout: each column is its own append-only file of fixed-width values.
+# Variable-length data (decklists, turns, rounds) lives in child tables and is
+# addressed from the games table through cumulative end offsets.
+SCHEMA = {
+    "games": [
+        ("seed", "q"),
+        ("player_faction", "b"),
+        ("ai_faction", "b"),
+        ("winner", "b"),
+        ("deck_end", "q"),
+        ("player_deck_size", "h"),
+        ("turns_end", "q"),
+        ("rounds_end", "q"),
+    ],
+    "decks": [
+        ("card", "h"),
+    ],
+    "turns": [
+        ("game", "q"),
+        ("round", "b"),
+        ("side", "b"),
+        ("card", "h"),
+        ("player_score", "i"),
+        ("ai_score", "i"),
+    ],
+    "rounds": [
+        ("game", "q"),
+        ("round", "b"),
+        ("player_score", "i"),
+        ("ai_score", "i"),
+    ],
+}
+
+
+class RecordWriter:
+    def __init__(self, root, shard_name=None, flush_games=256):
+        """
+        Open a new shard for appending game records.
+
+        Every writer owns its own shard directory, so any number of processes
+        can write into the same dataset root without locking.
+
+        :param root: Dataset directory (created if missing).
+        :param shard_name: Name of the shard directory (defaults to host, pid and a random suffix).
+        :param flush_games: Number of finished games buffered before writing to disk.
+        """
+        if shard_name is None:
+            shard_name = f"shard-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.path = os.path.join(root, shard_name)
+        os.makedirs(self.path, exist_ok=True)
+        self.flush_games = flush_games
+
+        meta_path = os.path.join(self.path, "meta.json")
+        if not os.path.exists(meta_path):
+            with open(meta_path, "w") as meta_file:
+                json.dump({"version": FORMAT_VERSION, "byteorder": sys.byteorder, "schema": SCHEMA}, meta_file)
+
+        # Continue from the complete games an earlier writer left in this shard,
+        # cutting off the rows of any game it did not finish flushing
+        rows = _complete_rows(self.path)
+        self.files = {}
+        self.buffers = {}
+        for table, columns in SCHEMA.items():
+            for column, typecode in columns:
+                key = (table, column)
+                column_path = os.path.join(self.path, f"{table}.{column}")
+                size = rows[table] * array(typecode).itemsize
+                if os.path.exists(column_path) and os.path.getsize(column_path) > size:
+                    os.truncate(column_path, size)
+                self.files[key] = open(column_path, "ab")
+                self.buffers[key] = array(typecode)
+
+        self.games_written = rows["games"]
+        self.offsets = {table: rows[table] for table in ("decks", "turns", "rounds")}
+        self.buffered_games = 0
+        self.current = None
+
+    def begin_game(self, seed, player_faction, ai_faction, player_decklist, ai_decklist):
+        """
+        Start recording a new game.
+        :param seed: Random seed the game was played with.
+        :param player_faction: Faction name of the player side.
+        :param ai_faction: Faction name of the AI side.
+        :param player_decklist: List of Card objects the player side started with.
+        :param ai_decklist: List of Card objects the AI side started with.
+        """
+        if self.current is not None:
+            raise ValueError("Previous game was not finished.")
+        self.current = {
+            "seed": seed,
+            "player_faction": FACTIONS.index(player_faction),
+            "ai_faction": FACTIONS.index(ai_faction),
+            "decks": [card_id(card) for card in player_decklist] + [card_id(card) for card in ai_decklist],
+            "player_deck_size": len(player_decklist),
+            "turns": [],
+            "rounds": [],
+        }
+
+    def record_turn(self, side, card, board):
+        """
+        Record a single turn of the current game.
+        :param side: "player" or "ai".
+        :param card: The card played (Card object), or None for a pass.
+        :param board: The board after the turn (anything with calculate_total_score).
+        """
+        self.current["turns"].append((
+            len(self.current["rounds"]) + 1,
+            SIDES.index(side),
+            NO_CARD if card is None else card_id(card),
+            board.calculate_total_score("player"),
+            board.calculate_total_score("ai"),
+        ))
+
+    def record_round(self, board):
+        """
+        Record the final scores of the round that just ended.
+        :param board: The board at the end of the round.
+        """
+        self.current["rounds"].append((
+            len(self.current["rounds"]) + 1,
+            board.calculate_total_score("player"),
+            board.calculate_total_score("ai"),
+        ))
+
+    def end_game(self, winner):
+        """
+        Finish the current game and queue it for writing.
+        :param winner: "player", "ai", or None for a tie.
+        """
+        game = self.current
+        self.current = None
+        index = self.games_written + self.buffered_games
+
+        for value in game["decks"]:
+            self.buffers[("decks", "card")].append(value)
+        for round_number, side, card, player_score, ai_score in game["turns"]:
+            self._append("turns", (index, round_number, side, card, player_score, ai_score))
+        for round_number, player_score, ai_score in game["rounds"]:
+            self._append("rounds", (index, round_number, player_score, ai_score))
+
+        self.offsets["decks"] += len(game["decks"])
+        self.offsets["turns"] += len(game["turns"])
+        self.offsets["rounds"] += len(game["rounds"])
+        self._append("games", (
+            game["seed"],
+            game["player_faction"],
+            game["ai_faction"],
+            TIE if winner is None else SIDES.index(winner),
+            self.offsets["decks"],
+            game["player_deck_size"],
+            self.offsets["turns"],
+            self.offsets["rounds"],
+        ))
+
+        self.buffered_games += 1
+        if self.buffered_games >= self.flush_games:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all buffered games to disk.
+
+        Child tables are written before the games table, so a reader never
+        sees a game whose turns or rounds are missing.
+        """
+        for table in ("decks", "turns", "rounds", "games"):
+            for column, typecode in SCHEMA[table]:
+                key = (table, column)
+                self.buffers[key].tofile(self.files[key])
+                self.buffers[key] = array(typecode)
+                self.files[key].flush()
+        self.games_written += self.buffered_games
+        self.buffered_games = 0
+
+    def close(self):
+        """
+        Flush remaining games and close all column files.
+        """
+        self.flush()
+        for column_file in self.files.values():
+            column_file.close()
+        self.files = {}
+
+    def _append(self, table, row):
+        for (column, _), value in zip(SCHEMA[table], row):
+            self.buffers[(table, column)].append(value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+class Shard:
+    def __init__(self, path):
+        """
+        Open a shard written by a RecordWriter for reading.
+
+        Columns are memory-mapped and exposed as typed memoryviews, so opening
+        a shard does not read its data into memory.
+
+        :param path: Path of the shard directory.
+        """
+        self.path = path
+        self.maps = []
+        self.columns = {}
+        rows = _complete_rows(path)
+        for table, columns in SCHEMA.items():
+            for column, typecode in columns:
+                self.columns[(table, column)] = self._map(table, column, typecode, rows[table])
+        self.num_games = rows["games"]
+
+    def column(self, table, column):
+        """
+        Get a column as a typed memoryview.
+        :param table: Table name ("games", "decks", "turns" or "rounds").
+        :param column: Column name within the table.
+        :return: Memoryview over the column values.
+        """
+        values = self.columns[(table, column)]
+        if table == "games":
+            return values[:self.num_games]
+        if self.num_games == 0:
+            return values[:0]
+        end_column = {"decks": "deck_end", "turns": "turns_end", "rounds": "rounds_end"}[table]
+        return values[:self.columns[("games", end_column)][self.num_games - 1]]
+
+    def span(self, table, game):
+        """
+        Get the row range of a child table belonging to one game.
+        :param table: "decks", "turns" or "rounds".
+        :param game: Game index within the shard.
+        :return: (start, end) row indices.
+        """
+        end_column = {"decks": "deck_end", "turns": "turns_end", "rounds": "rounds_end"}[table]
+        ends = self.columns[("games", end_column)]
+        return (ends[game - 1] if game else 0), ends[game]
+
+    def decklists(self, game):
+        """
+        Get the card ids both sides started a game with.
+        :param game: Game index within the shard.
+        :return: (player_card_ids, ai_card_ids) memoryviews.
+        """
+        start, end = self.span("decks", game)
+        split = start + self.columns[("games", "player_deck_size")][game]
+        cards = self.columns[("decks", "card")]
+        return cards[start:split], cards[split:end]
+
+    def close(self):
+        """
+        Release all memory maps.
+
+        Views returned by column or decklists should be dropped first; a map
+        that is still viewed stays open until its last view is garbage collected.
+        """
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        for mapping in self.maps:
+            try:
+                mapping.close()
+            except BufferError:
+                pass  # Still exported to a caller's view
+        self.maps = []
+
+    def _map(self, table, column, typecode, length):
+        itemsize = array(typecode).itemsize
+        if length == 0:
+            return memoryview(array(typecode))
+        with open(os.path.join(self.path, f"{table}.{column}"), "rb") as column_file:
+            mapping = mmap.mmap(column_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.maps.append(mapping)
+        return memoryview(mapping)[:length * itemsize].cast(typecode)
+
+    def __len__(self):
+        """Return the number of complete games in the shard."""
+        return self.num_games
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def open_dataset(root):
+    """
+    Open every shard in a dataset directory.
+    :param root: Dataset directory.
+    :return: List of Shard objects, sorted by shard name.
+    """
+    if not os.path.isdir(root):
+        return []
+    return [Shard(os.path.join(root, name)) for name in list_shards(root)]
+
+
+def list_shards(root):
+    """
+    List the shard directories of a dataset.
+    :param root: Dataset directory.
+    :return: Sorted list of shard directory names.
+    """
+    return sorted(name for name in os.listdir(root)
+                  if os.path.exists(os.path.join(root, name, "meta.json")))
+
+
+def _complete_rows(path):
+    """
+    Count the rows of each table that belong to completely written games.
+
+    A writer that crashed mid-flush may leave columns of unequal length, and
+    child rows of games whose games row never reached the disk.
+
+    :param path: Path of the shard directory.
+    :return: Dictionary table name -> number of rows.
+    """
+    lengths = {table: min(_column_length(path, table, column) for column, _ in columns)
+               for table, columns in SCHEMA.items()}
+    ends = {"decks": "deck_end", "turns": "turns_end", "rounds": "rounds_end"}
+
+    # Only trust games whose child rows are fully on disk
+    games = lengths["games"]
+    while games and any(_column_value(path, "games", end, games - 1) > lengths[table]
+                        for table, end in ends.items()):
+        games -= 1
+    rows = {table: _column_value(path, "games", end, games - 1) if games else 0 for table, end in ends.items()}
+    rows["games"] = games
+    return rows
+
+
+def _column_value(path, table, column, index):
+    """Read a single value from a column file."""
+    values = array(dict(SCHEMA[table])[column])
+    with open(os.path.join(path, f"{table}.{column}"), "rb") as column_file:
+        column_file.seek(index * values.itemsize)
+        values.frombytes(column_file.read(values.itemsize))
+    return values[0]
+
+
+def _column_length(path, table, column):
+    """Return the number of complete values stored in a column file."""
+    typecode = dict(SCHEMA[table])[column]
+    try:
+        size = os.path.getsize(os.path.join(path, f"{table}.{column}"))
+    except OSError:
+        return 0
+    return size // array(typecode).itemsize
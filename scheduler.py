@@ -0,0 +1,220 @@
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import Pool
+from search import PASS_MOVE, anytime_search, pooled_search
+
+
+class _Job:
+    __slots__ = ("deadline", "order", "steps", "best", "fallback", "future", "submitted", "slices", "slice_time")
+
+    def __init__(self, deadline, order, steps, fallback):
+        self.deadline = deadline
+        self.order = order
+        self.steps = steps
+        self.best = None
+        self.fallback = fallback
+        self.future = Future()
+        self.submitted = time.monotonic()
+        self.slices = 0
+        self.slice_time = 0.0  # Total time spent in slices, for estimating the next one
+
+    def __lt__(self, other):
+        # Decisions without any answer yet go first, then earliest deadline first
+        return (self.slices > 0, self.deadline, self.order) < (other.slices > 0, other.deadline, other.order)
+
+
+def single_step(function, *args):
+    """
+    Wrap a plain call, such as AIController.play_turn, as a one-step search.
+    :param function: The callable to run.
+    :param args: Arguments for the callable.
+    :return: Generator that runs the call and returns its result.
+    """
+    return function(*args)
+    yield  # Makes this a generator; the call runs on the first step
+
+
+class AIScheduler:
+    def __init__(self, workers=None, latency_window=1000, processes=True):
+        """
+        Share a pool of workers between the AI decisions of many matches.
+
+        Every decision is an anytime search: a generator yielding its best
+        move so far after each slice of work. Workers always advance the job
+        with the earliest deadline by one slice and then requeue it, so
+        concurrent searches interleave, and a job is answered with its best
+        move as soon as another slice would not fit before its deadline.
+        Decisions that have no answer yet get their first slice before any
+        other decision gets another, so every decision has a move early on.
+
+        Worker threads only order the work. Searches queued with submit_search
+        run their slices in a process pool with one process per thread, so
+        the scheduler uses as many cores as it has workers. Generators queued
+        with submit run in the threads themselves, and pure-Python ones
+        share one core between them.
+
+        :param workers: Number of worker threads (defaults to the CPU count).
+        :param latency_window: Number of recent decisions kept for latency percentiles.
+        :param processes: Whether submit_search runs slices in worker processes.
+        """
+        workers = workers or os.cpu_count() or 1
+        self.pool = Pool(workers) if processes else None
+        self.queue = []
+        self.condition = threading.Condition()
+        self.order = itertools.count()
+        self.running = True
+        self.latency_window = latency_window
+        self.latencies = []
+        self.completed = 0
+        self.deadline_misses = 0
+        self.max_lateness = 0.0
+        self.max_queue_depth = 0
+        self.slice_estimate = 0.0  # Moving average of slice durations across all jobs
+        self.threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, steps, budget, fallback=None):
+        """
+        Queue a decision.
+        :param steps: Generator yielding the best move so far after each slice.
+        :param budget: Seconds until the move is due.
+        :param fallback: Move to return if no slice finished in time.
+        :return: Future resolving to the chosen move.
+        """
+        job = _Job(time.monotonic() + budget, next(self.order), steps, fallback)
+        with self.condition:
+            if not self.running:
+                raise RuntimeError("Scheduler has been shut down.")
+            heapq.heappush(self.queue, job)
+            self.max_queue_depth = max(self.max_queue_depth, len(self.queue))
+            self.condition.notify()
+        return job.future
+
+    def submit_search(self, state, side, budget, visits=None, wins=None, batch=32):
+        """
+        Queue a Monte Carlo search of a position.
+        :param state: The root BitState.
+        :param side: The side to move.
+        :param budget: Seconds until the move is due.
+        :param visits: Optional per-move visit counts to start from.
+        :param wins: Optional per-move win counts to start from.
+        :param batch: Rollouts per slice.
+        :return: Future resolving to the chosen move id (PASS_MOVE if nothing was searched).
+        """
+        if self.pool:
+            steps = pooled_search(self.pool, state, side, batch, visits, wins)
+        else:
+            steps = anytime_search(state, side, random.Random(), batch, visits, wins)
+        return self.submit(steps, budget, fallback=PASS_MOVE)
+
+    def submit_call(self, budget, function, *args):
+        """
+        Queue a non-incremental decision, such as AIController.play_turn.
+        :param budget: Seconds until the result is due.
+        :param function: The callable to run.
+        :param args: Arguments for the callable.
+        :return: Future resolving to the call's result.
+        """
+        return self.submit(single_step(function, *args), budget)
+
+    def metrics(self):
+        """
+        Report queue and deadline statistics.
+        :return: Dictionary of metrics; latencies are in milliseconds.
+        """
+        with self.condition:
+            latencies = sorted(self.latencies)
+            report = {
+                "queue_depth": len(self.queue),
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "deadline_misses": self.deadline_misses,
+                "miss_rate": self.deadline_misses / self.completed if self.completed else 0.0,
+                "max_lateness_ms": self.max_lateness * 1000,
+            }
+        if latencies:
+            report["p50_ms"] = latencies[len(latencies) // 2] * 1000
+            report["p99_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            report["max_ms"] = latencies[-1] * 1000
+        return report
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers; queued decisions are answered with their best move so far.
+        :param wait: Whether to wait for the worker threads and processes to exit.
+        """
+        with self.condition:
+            self.running = False
+            pending, self.queue = self.queue, []
+            self.condition.notify_all()
+        for job in pending:
+            self._finish(job)
+        if wait:
+            for thread in self.threads:
+                thread.join()
+        if self.pool:
+            self.pool.close()
+            if wait:
+                self.pool.join()
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while self.running and not self.queue:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                job = heapq.heappop(self.queue)
+
+            # Answer now if the next slice, judged by the averages so far, would run late.
+            # Slices stretch when workers contend for the interpreter, hence the margin.
+            now = time.monotonic()
+            expected = 2 * (job.slice_time / job.slices if job.slices else self.slice_estimate)
+            if now + expected >= job.deadline and (job.slices or now >= job.deadline):
+                self._finish(job)
+                continue
+
+            try:
+                started = time.monotonic()
+                job.best = next(job.steps)
+                elapsed = time.monotonic() - started
+                job.slice_time += elapsed
+                job.slices += 1
+                self.slice_estimate += (elapsed - self.slice_estimate) * 0.1
+            except StopIteration as stop:
+                if stop.value is not None:
+                    job.best = stop.value
+                self._finish(job)
+                continue
+            except Exception as error:
+                if not self.running:
+                    self._finish(job)  # The slice was cut off by shutdown, e.g. a closed pool
+                else:
+                    job.future.set_exception(error)
+                continue
+
+            with self.condition:
+                if not self.running:
+                    self._finish(job)
+                    continue
+                heapq.heappush(self.queue, job)
+                self.condition.notify()
+
+    def _finish(self, job):
+        finished = time.monotonic()
+        job.steps.close()
+        with self.condition:
+            self.completed += 1
+            if finished > job.deadline:
+                self.deadline_misses += 1
+                self.max_lateness = max(self.max_lateness, finished - job.deadline)
+            self.latencies.append(finished - job.submitted)
+            if len(self.latencies) > self.latency_window:
+                del self.latencies[0]
+        job.future.set_result(job.best if job.best is not None else job.fallback)
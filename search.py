@@ -0,0 +1,403 @@
+import os
+import random
+import time
+from array import array
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from ai_controller import AIController
+from bitboard import BitState, MASK_WORD_BITS, NUM_CARDS, ids_of
+from card import card_id
+
+PASS_MOVE = NUM_CARDS  # Move id for passing; every other move id is a card id
+NUM_MOVES = NUM_CARDS + 1
+NUM_MASKS = 12  # Hands, decks, graveyards and rows of both sides
+STATE_SIZE = 2 * NUM_MASKS + 10  # Number of int64 values in an encoded BitState
+_WORD_MASK = (1 << MASK_WORD_BITS) - 1
+
+
+def encode_state(state, buffer):
+    """
+    Write a BitState into a buffer of int64 values.
+
+    Card masks take two words each, low bits first, so ids up to
+    bitboard.MAX_CARDS fit in signed values.
+
+    :param state: The BitState.
+    :param buffer: Memoryview of at least STATE_SIZE int64 values.
+    """
+    masks = state.hands + state.decks + state.graveyards + state.rows[0] + state.rows[1]
+    values = [word for mask in masks for word in (mask & _WORD_MASK, mask >> MASK_WORD_BITS)]
+    values += (state.weather + state.horn + [int(flag) for flag in state.passed]
+               + [int(flag) for flag in state.leader_used] + state.health)
+    for index, value in enumerate(values):
+        buffer[index] = value
+
+
+def decode_state(buffer):
+    """
+    Read a BitState written by encode_state.
+    :param buffer: Memoryview of int64 values.
+    :return: BitState.
+    """
+    words = buffer[:STATE_SIZE].tolist()
+    masks = [words[index] | words[index + 1] << MASK_WORD_BITS for index in range(0, 2 * NUM_MASKS, 2)]
+    values = words[2 * NUM_MASKS:]
+    state = BitState()
+    state.hands = masks[0:2]
+    state.decks = masks[2:4]
+    state.graveyards = masks[4:6]
+    state.rows = [masks[6:9], masks[9:12]]
+    state.weather = values[0:2]
+    state.horn = values[2:4]
+    state.passed = [bool(flag) for flag in values[4:6]]
+    state.leader_used = [bool(flag) for flag in values[6:8]]
+    state.health = values[8:10]
+    return state
+
+
+def root_moves(state, side):
+    """
+    List the moves a side can make.
+    :param state: The BitState.
+    :param side: 0 for the player, 1 for the AI.
+    :return: List of move ids (card ids and PASS_MOVE).
+    """
+    return state.legal_moves(side) + [PASS_MOVE]
+
+
+def apply_move(state, side, move, rng):
+    """
+    Apply a move and return the side to move next, or None if the round is over.
+    :param state: The BitState to modify.
+    :param side: The side making the move.
+    :param move: Card id or PASS_MOVE.
+    :param rng: random.Random used for draws.
+    """
+    if move == PASS_MOVE:
+        state.passed[side] = True
+    else:
+        state.play(side, move, rng)
+    if state.passed[0] and state.passed[1]:
+        return None
+    return side if state.passed[1 - side] else 1 - side
+
+
+def determinize(state, side, rng):
+    """
+    Replace the opponent's hand with a random draw from the cards side cannot see.
+    :param state: The BitState to modify.
+    :param side: The searching side.
+    :param rng: random.Random used to deal the hand.
+    """
+    opponent = 1 - side
+    unseen = list(ids_of(state.hands[opponent] | state.decks[opponent]))
+    hand = rng.sample(unseen, state.hands[opponent].bit_count())
+    hand_mask = 0
+    for card in hand:
+        hand_mask |= 1 << card
+    state.decks[opponent] = (state.hands[opponent] | state.decks[opponent]) & ~hand_mask
+    state.hands[opponent] = hand_mask
+
+
+def rollout(state, side, rng):
+    """
+    Play a position out to the end of the match with a light random policy.
+
+    A side that is ahead passes half the time; otherwise it plays a random
+    card, and it passes when its hand is empty.
+
+    :param state: The BitState to play out (modified).
+    :param side: The side to move, or None if the current round is over.
+    :param rng: random.Random driving the playout.
+    :return: Index of the winning side, or None for a drawn match.
+    """
+    while True:
+        while side is not None:
+            hand = state.hands[side]
+            if not hand or (state.score(side) > state.score(1 - side) and rng.random() < 0.5):
+                move = PASS_MOVE
+            else:
+                move = rng.choice(list(ids_of(hand)))
+            side = apply_move(state, side, move, rng)
+
+        winner = state.end_round()
+        if winner is None:
+            # A drawn round costs both sides a life, so playouts always finish
+            state.health[0] -= 1
+            state.health[1] -= 1
+        if state.health[0] <= 0 or state.health[1] <= 0:
+            if state.health[0] == state.health[1]:
+                return None
+            return 0 if state.health[0] > 0 else 1
+        side = 1 if winner == 0 else 0  # The round loser starts the next round
+
+
+def search_root(state, side, rollouts, rng, visits=None, wins=None):
+    """
+    Flat Monte Carlo search: spread rollouts evenly over the root moves.
+    :param state: The root BitState (left unchanged).
+    :param side: The side to move.
+    :param rollouts: Number of rollouts to run.
+    :param rng: random.Random driving the search.
+    :param visits: Optional per-move visit counts to add to (indexable by move id).
+    :param wins: Optional per-move win counts (draws count half, in half points) to add to.
+    :return: (visits, wins).
+    """
+    visits = visits if visits is not None else [0] * NUM_MOVES
+    wins = wins if wins is not None else [0] * NUM_MOVES
+    moves = root_moves(state, side)
+    for index in range(rollouts):
+        move = moves[index % len(moves)]
+        child = state.copy()
+        determinize(child, side, rng)
+        winner = rollout(child, apply_move(child, side, move, rng), rng)
+        visits[move] += 1
+        wins[move] += 2 if winner == side else (1 if winner is None else 0)
+    return visits, wins
+
+
+def anytime_search(state, side, rng, batch=32, visits=None, wins=None):
+    """
+    Search in small batches, yielding the best move found so far after each.
+
+    Stopping the generator at any point leaves the last yielded move as the
+    answer, which is what a deadline scheduler needs.
+
+    :param state: The root BitState (left unchanged).
+    :param side: The side to move.
+    :param rng: random.Random driving the search.
+    :param batch: Rollouts per step.
+    :param visits: Optional per-move visit counts to start from.
+    :param wins: Optional per-move win counts to start from.
+    """
+    visits = visits if visits is not None else [0] * NUM_MOVES
+    wins = wins if wins is not None else [0] * NUM_MOVES
+    while True:
+        search_root(state, side, batch, rng, visits, wins)
+        yield best_move(visits, wins)
+
+
+def pooled_search(pool, state, side, batch=32, visits=None, wins=None):
+    """
+    Like anytime_search, but run every batch in a worker process.
+
+    The generator keeps the counts and sends only the encoded root with
+    each batch, so a search can be resumed by whichever worker is free.
+    Waiting on the worker does not hold the interpreter lock, which lets
+    threads that step many of these searches use one core each.
+
+    :param pool: multiprocessing Pool to run batches in.
+    :param state: The root BitState (left unchanged).
+    :param side: The side to move.
+    :param batch: Rollouts per step.
+    :param visits: Optional per-move visit counts to start from.
+    :param wins: Optional per-move win counts to start from.
+    """
+    visits = visits if visits is not None else [0] * NUM_MOVES
+    wins = wins if wins is not None else [0] * NUM_MOVES
+    encoded = array("q", bytes(8 * STATE_SIZE))
+    encode_state(state, encoded)
+    while True:
+        batch_visits, batch_wins = pool.apply(_search_batch, (encoded, side, batch, random.randrange(1 << 30)))
+        for move in range(NUM_MOVES):
+            visits[move] += batch_visits[move]
+            wins[move] += batch_wins[move]
+        yield best_move(visits, wins)
+
+
+def _search_batch(encoded, side, rollouts, seed):
+    """Worker entry point: search an encoded root and return its counts."""
+    return search_root(decode_state(encoded), side, rollouts, random.Random(seed))
+
+
+def best_move(visits, wins):
+    """
+    Pick the move with the best win rate among visited moves.
+    :param visits: Per-move visit counts.
+    :param wins: Per-move win counts in half points.
+    :return: Move id, or None if nothing was visited.
+    """
+    best, best_rate = None, -1.0
+    for move in range(NUM_MOVES):
+        if visits[move]:
+            rate = wins[move] / visits[move]
+            if rate > best_rate:
+                best, best_rate = move, rate
+    return best
+
+
+# Shared-memory views of the current worker process
+_worker = {}
+
+
+def _attach(root_name, stats_name):
+    """Pool initializer: map the root and statistics blocks into the worker."""
+    root = SharedMemory(root_name)
+    stats = SharedMemory(stats_name)
+    _worker["blocks"] = (root, stats)
+    _worker["root"] = root.buf.cast("q")
+    _worker["stats"] = stats.buf.cast("q")
+
+
+def _search_slot(task):
+    """Worker entry point: search the shared root and write counts into this slot."""
+    slot, side, rollouts, seed = task
+    state = decode_state(_worker["root"])
+    visits, wins = search_root(state, side, rollouts, random.Random(seed))
+    stats = _worker["stats"]
+    base = slot * NUM_MOVES * 2
+    for move in range(NUM_MOVES):
+        stats[base + move] = visits[move]
+        stats[base + NUM_MOVES + move] = wins[move]
+    return slot
+
+
+class ParallelSearch:
+    def __init__(self, processes=None):
+        """
+        Root-parallel search over a pool of worker processes.
+
+        The root position is written once into a shared-memory block that
+        every worker reads; each worker writes its move statistics into its
+        own slot of a shared array, and the slots are summed afterwards.
+
+        :param processes: Number of worker processes (defaults to the CPU count).
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.root_block = SharedMemory(create=True, size=8 * STATE_SIZE)
+        self.stats_block = SharedMemory(create=True, size=8 * 2 * NUM_MOVES * self.processes)
+        self.root = self.root_block.buf.cast("q")
+        self.stats = self.stats_block.buf.cast("q")
+        self.pool = Pool(self.processes, _attach, (self.root_block.name, self.stats_block.name))
+        self.last_rate = 0.0  # Rollouts per second of the last search
+
+    def search(self, state, side, rollouts, seed=None):
+        """
+        Search a position with all workers.
+        :param state: The root BitState.
+        :param side: The side to move.
+        :param rollouts: Total number of rollouts, split across workers.
+        :param seed: Base random seed (a fresh one is drawn if None).
+        :return: (best move id, merged visits, merged wins).
+        """
+        encode_state(state, self.root)
+        seed = random.randrange(1 << 30) if seed is None else seed
+        share, extra = divmod(rollouts, self.processes)
+        tasks = [(slot, side, share + (slot < extra), seed + slot) for slot in range(self.processes)]
+
+        started = time.perf_counter()
+        self.pool.map(_search_slot, tasks)
+        elapsed = time.perf_counter() - started
+        self.last_rate = rollouts / elapsed if elapsed > 0 else 0.0
+
+        visits = [0] * NUM_MOVES
+        wins = [0] * NUM_MOVES
+        for slot in range(self.processes):
+            base = slot * NUM_MOVES * 2
+            for move in range(NUM_MOVES):
+                visits[move] += self.stats[base + move]
+                wins[move] += self.stats[base + NUM_MOVES + move]
+        return best_move(visits, wins), visits, wins
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory.
+        """
+        self.pool.close()
+        self.pool.join()
+        self.root.release()
+        self.stats.release()
+        for block in (self.root_block, self.stats_block):
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+class SearchAIController(AIController):
+    def __init__(self, player, board, opponent, rollouts=2000, search=None, scheduler=None, move_time=1.0,
+                 book=None, ponderer=None):
+        """
+        AI that picks its moves by Monte Carlo search instead of weighted chance.
+        :param player: The AI player object (Player class instance).
+        :param board: The game board (Board class instance).
+        :param opponent: The human player object (Player class instance).
+        :param rollouts: Rollouts to run per move.
+        :param search: Optional ParallelSearch to spread rollouts over processes.
+        :param scheduler: Optional AIScheduler; the search then runs until its per-move deadline.
+        :param move_time: Seconds per move when a scheduler is used.
+        :param book: Optional OpeningBook probed before searching in the first round.
+        :param ponderer: Optional Ponderer that searches during the opponent's turn.
+        """
+        super().__init__(player, board)
+        self.opponent = opponent
+        self.rollouts = rollouts
+        self.search = search
+        self.scheduler = scheduler
+        self.move_time = move_time
+        self.book = book
+        self.ponderer = ponderer
+        self.planned_move = None
+
+    def plan(self):
+        """
+        Search the current position for the AI's best move.
+        :return: Move id (card id or PASS_MOVE).
+        """
+        state = BitState.from_objects(self.board, self.opponent, self.player)
+        if self.book and self.went_first is not None:
+            move = self.book.probe(state, 1, self.went_first)
+            if move is not None:
+                return move
+        # Start from whatever was searched while the opponent was thinking
+        visits, wins = self.ponderer.take(state) if self.ponderer else (None, None)
+        if self.scheduler:
+            move = self.scheduler.submit_search(state, 1, self.move_time, visits, wins).result()
+        elif self.search:
+            move, searched_visits, searched_wins = self.search.search(state, 1, self.rollouts)
+            if visits:
+                move = best_move([a + b for a, b in zip(visits, searched_visits)],
+                                 [a + b for a, b in zip(wins, searched_wins)])
+        else:
+            move = best_move(*search_root(state, 1, self.rollouts, random.Random(), visits, wins))
+        return PASS_MOVE if move is None else move
+
+    def begin_pondering(self):
+        """
+        Search likely replies in the background while the opponent chooses a move.
+        """
+        if self.ponderer and not self.player.passed:
+            self.ponderer.start(BitState.from_objects(self.board, self.opponent, self.player))
+
+    def end_pondering(self, card):
+        """
+        Keep the background search for the move the opponent made.
+        :param card: The card the opponent played (Card object), or None for a pass.
+        """
+        if self.ponderer:
+            self.ponderer.stop(PASS_MOVE if card is None else card_id(card))
+
+    def decide_action(self, opponent_score):
+        """
+        Decide whether to play a card or pass, based on the search result.
+        :param opponent_score: The current score of the opponent.
+        :return: 'play_card' or 'pass'.
+        """
+        if not self.player.hand:
+            return "pass"
+        self.planned_move = self.plan()
+        return "pass" if self.planned_move == PASS_MOVE else "play_card"
+
+    def choose_card(self):
+        """
+        Return the card the search picked.
+        :return: The selected card (Card object).
+        """
+        for card in self.player.hand:
+            if card_id(card) == self.planned_move:
+                return card
+        return super().choose_card()
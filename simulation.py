@@ -0,0 +1,184 @@
+import random
+from collections import namedtuple
+from bitboard import BitState, SIDES, ids_of, mask_of
+from card import all_cards, northern_realms_deck, nilfgaardian_deck, neutral_deck, special_cards
+from mulligan import MulliganTables
+from search import PASS_MOVE, apply_move, best_move, search_root
+
+RULES_VERSION = 2  # Bump whenever a change to the simulated rules would change match results
+
+FACTION_CARDS = {
+    "Northern Realms": northern_realms_deck,
+    "Nilfgaardian Empire": nilfgaardian_deck,
+}
+
+# winner is 0 (player), 1 (AI) or None for a draw; rounds holds (player_score, ai_score) per round
+MatchResult = namedtuple("MatchResult", ["winner", "first", "rounds"])
+
+
+def standard_decklists(player_faction, ai_faction):
+    """
+    Build the decklists main.py deals to each seat.
+    :param player_faction: Faction name of the player seat.
+    :param ai_faction: Faction name of the AI seat.
+    :return: (player_cards, ai_cards) lists of Card objects.
+    """
+    return (FACTION_CARDS[player_faction] + neutral_deck[:5] + special_cards[:3],
+            FACTION_CARDS[ai_faction] + neutral_deck[5:10] + special_cards[3:6])
+
+
+def rollout_policy(state, side, rng):
+    """The light policy search.rollout plays with: pass half the time when ahead."""
+    hand = state.hands[side]
+    if not hand or (state.score(side) > state.score(1 - side) and rng.random() < 0.5):
+        return PASS_MOVE
+    return rng.choice(list(ids_of(hand)))
+
+
+def greedy_policy(state, side, rng):
+    """Pass once ahead of an opponent who passed; otherwise play the card that scores most."""
+    hand = state.hands[side]
+    if not hand or (state.passed[1 - side] and state.score(side) > state.score(1 - side)):
+        return PASS_MOVE
+    best, best_margin = PASS_MOVE, None
+    for card in ids_of(hand):
+        child = state.copy()
+        child.play(side, card, rng)
+        margin = child.score(side) - child.score(1 - side)
+        if best_margin is None or margin > best_margin:
+            best, best_margin = card, margin
+    return best
+
+
+def search_policy(rollouts=200):
+    """
+    Build a policy that picks moves with flat Monte Carlo search.
+    :param rollouts: Rollouts per move.
+    """
+    def policy(state, side, rng):
+        move = best_move(*search_root(state, side, rollouts, rng))
+        return PASS_MOVE if move is None else move
+    return policy
+
+
+AGENTS = {
+    "rollout": lambda config: rollout_policy,
+    "greedy": lambda config: greedy_policy,
+    "search": lambda config: search_policy(config.get("rollouts", 200)),
+}
+
+
+def make_policy(agent, config=None):
+    """
+    Build a policy by agent name.
+    :param agent: A key of AGENTS.
+    :param config: Dictionary of agent settings.
+    :return: Callable (state, side, rng) -> move id.
+    """
+    return AGENTS[agent](config or {})
+
+
+def deal(player_cards, ai_cards, rng, redraw=True):
+    """
+    Set up the start of a match: shuffle, draw ten cards each and redraw.
+
+    As in Game.redraw_phase and AIController.redraw, replaced cards leave
+    the match: they go back to neither the deck nor the graveyard.
+
+    :param player_cards: Decklist of the player seat.
+    :param ai_cards: Decklist of the AI seat.
+    :param rng: random.Random used for the deal.
+    :param redraw: Whether both sides redraw as the mulligan tables advise.
+    :return: BitState at the start of the first round.
+    """
+    state = BitState()
+    for side, cards in enumerate((player_cards, ai_cards)):
+        order = cards[:]
+        rng.shuffle(order)
+        hand, deck = order[:10], order[10:]
+        if redraw:
+            indices, _ = _tables(cards).best_redraw(hand)
+            replaced = [hand[index] for index in indices]
+            hand = [card for card in hand if card not in replaced] + deck[:len(replaced)]
+            deck = deck[len(replaced):]
+        state.hands[side] = mask_of(hand)
+        state.decks[side] = mask_of(deck)
+    return state
+
+
+_tables_cache = {}
+
+
+def _tables(cards):
+    key = tuple(id(card) for card in cards)
+    if key not in _tables_cache:
+        _tables_cache[key] = MulliganTables(cards)
+    return _tables_cache[key]
+
+
+def play_match(state, first, policies, rng, observer=None, writer=None):
+    """
+    Play a dealt match to the end.
+
+    Follows the rules search.rollout plays by: the loser of a round starts
+    the next one and a drawn round costs both sides a life.
+
+    :param state: BitState from deal (modified).
+    :param first: Side that won the coin toss (0 or 1).
+    :param policies: Pair of policies for the player and AI seats.
+    :param rng: random.Random driving draws and policies.
+    :param observer: Optional callable (state, side, move, round_number, ply) called before each move.
+    :param writer: Optional records.RecordWriter whose current game receives every turn and round.
+    :return: MatchResult.
+    """
+    rounds = []
+    side = first
+    while True:
+        ply = 0
+        while side is not None:
+            move = policies[side](state, side, rng)
+            if observer:
+                observer(state, side, move, len(rounds) + 1, ply)
+            next_side = apply_move(state, side, move, rng)
+            if writer:
+                writer.record_turn(SIDES[side], None if move == PASS_MOVE else all_cards[move], state)
+            side = next_side
+            ply += 1
+
+        rounds.append((state.score(0), state.score(1)))
+        if writer:
+            writer.record_round(state)
+        winner = state.end_round()
+        if winner is None:
+            state.health[0] -= 1
+            state.health[1] -= 1
+        if state.health[0] <= 0 or state.health[1] <= 0:
+            if state.health[0] == state.health[1]:
+                return MatchResult(None, first, rounds)
+            return MatchResult(0 if state.health[0] > 0 else 1, first, rounds)
+        side = 1 if winner == 0 else 0
+
+
+def simulate(seed, player_faction, ai_faction, policies, observer=None, writer=None, decklists=None):
+    """
+    Play one seeded match between the standard decklists of two factions.
+    :param seed: Random seed; the same seed always plays the same match.
+    :param player_faction: Faction name of the player seat.
+    :param ai_faction: Faction name of the AI seat.
+    :param policies: Pair of policies for the player and AI seats.
+    :param observer: Optional move observer, see play_match.
+    :param writer: Optional records.RecordWriter to log the match to.
+    :param decklists: Optional (player_cards, ai_cards) to play instead of the standard decklists.
+    :return: MatchResult.
+    """
+    rng = random.Random(seed)
+    player_cards, ai_cards = decklists or standard_decklists(player_faction, ai_faction)
+    state = deal(player_cards, ai_cards, rng)
+    first = rng.randrange(2)  # Coin toss
+
+    if writer:
+        writer.begin_game(seed, player_faction, ai_faction, player_cards, ai_cards)
+    result = play_match(state, first, policies, rng, observer, writer)
+    if writer:
+        writer.end_game(None if result.winner is None else SIDES[result.winner])
+    return result
@@ -0,0 +1,262 @@
+import struct
+from bitboard import MAX_CARDS, ROW_NAMES, ids_of, mask_of
+
+# Update kinds
+DELTA = 0
+KEYFRAME = 1
+
+# Event types
+CARD_PLACED = 0  # side, row, card id
+CARD_REMOVED = 1  # side, row, card id
+EFFECT_APPLIED = 2  # side, row, effect
+EFFECT_CLEARED = 3  # side, row, effect
+SCORE = 4  # side, score
+PASS = 5  # side, 1 if passed else 0
+ROUND_END = 6  # winner side (2 for a tie), round number
+HAND_SIZE = 7  # side, number of cards in hand
+HAND = 8  # side, card id mask (hidden information)
+
+EFFECTS = ["weather", "horn"]
+TIE = 2
+
+# Audiences and the hands they may see
+AUDIENCES = {
+    "public": (),
+    "player": (0,),
+    "ai": (1,),
+    "caster": (0, 1),
+}
+
+HEADER = struct.Struct("<BIH")  # kind, sequence number, event count
+EVENT = struct.Struct("<BBh")  # type, side << 4 | row, value
+HAND_EVENT = struct.Struct("<BBQQ")  # type, side, card id mask (low and high 64 bits)
+_LOW_BITS = (1 << 64) - 1
+assert MAX_CARDS <= 128, "Hand events carry masks of at most 128 card ids"
+
+
+def take_snapshot(board, player, ai):
+    """
+    Capture the broadcast-relevant parts of a game.
+    :param board: The Board object.
+    :param player: The human Player.
+    :param ai: The AI Player.
+    :return: Dictionary of masks, effects, scores and flags per side.
+    """
+    snapshot = {"rows": [], "effects": [], "scores": [], "passed": [], "hands": []}
+    for side, (owner, rows) in enumerate(((player, board.player_rows), (ai, board.ai_rows))):
+        snapshot["rows"].append([mask_of(rows[name].cards) for name in ROW_NAMES])
+        snapshot["effects"].append([frozenset(rows[name].effects) for name in ROW_NAMES])
+        snapshot["scores"].append(board.calculate_total_score("player" if side == 0 else "ai"))
+        snapshot["passed"].append(owner.passed)
+        snapshot["hands"].append(mask_of(owner.hand))
+    return snapshot
+
+
+def keyframe_events(snapshot, round_winners=()):
+    """
+    List the events that rebuild a snapshot and the match history from an empty board.
+    :param snapshot: Snapshot from take_snapshot.
+    :param round_winners: Winner side (or TIE) of every finished round, in order.
+    :return: List of event tuples (type, side, row, value).
+    """
+    history = [(ROUND_END, side, 0, number) for number, side in enumerate(round_winners, 1)]
+    return history + diff_events(None, snapshot)
+
+
+def diff_events(old, new):
+    """
+    List the events that turn one snapshot into another.
+    :param old: Previous snapshot, or None for an empty board.
+    :param new: Current snapshot.
+    :return: List of event tuples (type, side, row, value).
+    """
+    events = []
+    for side in (0, 1):
+        for row in range(len(ROW_NAMES)):
+            before = old["rows"][side][row] if old else 0
+            after = new["rows"][side][row]
+            for card in ids_of(before & ~after):
+                events.append((CARD_REMOVED, side, row, card))
+            for card in ids_of(after & ~before):
+                events.append((CARD_PLACED, side, row, card))
+
+            effects_before = old["effects"][side][row] if old else frozenset()
+            effects_after = new["effects"][side][row]
+            for effect in effects_before - effects_after:
+                if effect in EFFECTS:
+                    events.append((EFFECT_CLEARED, side, row, EFFECTS.index(effect)))
+            for effect in effects_after - effects_before:
+                if effect in EFFECTS:
+                    events.append((EFFECT_APPLIED, side, row, EFFECTS.index(effect)))
+
+        if old is None or old["scores"][side] != new["scores"][side]:
+            events.append((SCORE, side, 0, new["scores"][side]))
+        if old is None or old["passed"][side] != new["passed"][side]:
+            events.append((PASS, side, 0, int(new["passed"][side])))
+        if old is None or old["hands"][side] != new["hands"][side]:
+            events.append((HAND_SIZE, side, 0, new["hands"][side].bit_count()))
+            events.append((HAND, side, 0, new["hands"][side]))
+    return events
+
+
+def encode(kind, sequence, events, audience):
+    """
+    Encode an update for one audience, dropping hands it may not see.
+    :param kind: DELTA or KEYFRAME.
+    :param sequence: Update sequence number.
+    :param events: List of event tuples.
+    :param audience: Audience name from AUDIENCES.
+    :return: Encoded bytes.
+    """
+    visible = AUDIENCES[audience]
+    parts = []
+    for event_type, side, row, value in events:
+        if event_type == HAND:
+            if side in visible:
+                parts.append(HAND_EVENT.pack(HAND, side, value & _LOW_BITS, value >> 64))
+        else:
+            parts.append(EVENT.pack(event_type, side << 4 | row, value))
+    return HEADER.pack(kind, sequence, len(parts)) + b"".join(parts)
+
+
+def decode(data):
+    """
+    Decode an update produced by encode.
+    :param data: Encoded bytes.
+    :return: (kind, sequence, list of event tuples).
+    """
+    kind, sequence, count = HEADER.unpack_from(data, 0)
+    offset = HEADER.size
+    events = []
+    for _ in range(count):
+        if data[offset] == HAND:
+            event_type, side, low, high = HAND_EVENT.unpack_from(data, offset)
+            events.append((event_type, side, 0, low | high << 64))
+            offset += HAND_EVENT.size
+        else:
+            event_type, packed, value = EVENT.unpack_from(data, offset)
+            events.append((event_type, packed >> 4, packed & 0xF, value))
+            offset += EVENT.size
+    return kind, sequence, events
+
+
+class SpectatorFeed:
+    def __init__(self, keyframe_interval=20):
+        """
+        Broadcast a live match to any number of subscribers as compact deltas.
+
+        Each update is encoded once per audience that has subscribers and the
+        same bytes are handed to every subscriber of that audience.
+
+        :param keyframe_interval: Number of updates between full keyframes.
+        """
+        self.keyframe_interval = keyframe_interval
+        self.subscribers = {audience: [] for audience in AUDIENCES}
+        self.snapshot = None
+        self.sequence = 0
+        self.round_winners = []
+        self.bytes_sent = 0
+
+    def subscribe(self, callback, audience="public"):
+        """
+        Add a subscriber; it first receives a keyframe of the current state.
+        :param callback: Called with the encoded bytes of every update.
+        :param audience: Audience name from AUDIENCES.
+        """
+        if audience not in AUDIENCES:
+            raise ValueError(f"Unknown audience: {audience}")
+        self.subscribers[audience].append(callback)
+        if self.snapshot is not None:
+            callback(encode(KEYFRAME, self.sequence, keyframe_events(self.snapshot, self.round_winners), audience))
+
+    def unsubscribe(self, callback):
+        """
+        Remove a subscriber from every audience.
+        :param callback: The callback passed to subscribe.
+        """
+        for callbacks in self.subscribers.values():
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def publish(self, board, player, ai):
+        """
+        Broadcast whatever changed since the last update.
+        :param board: The Board object.
+        :param player: The human Player.
+        :param ai: The AI Player.
+        """
+        snapshot = take_snapshot(board, player, ai)
+        if self.snapshot is None or self.sequence % self.keyframe_interval == 0:
+            kind, events = KEYFRAME, keyframe_events(snapshot, self.round_winners)
+        else:
+            kind, events = DELTA, diff_events(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        if events or kind == KEYFRAME:
+            self._broadcast(kind, events)
+
+    def round_end(self, winner):
+        """
+        Broadcast the end of a round.
+        :param winner: "player", "ai", or None for a tie.
+        """
+        side = TIE if winner is None else (0 if winner == "player" else 1)
+        self.round_winners.append(side)
+        self._broadcast(DELTA, [(ROUND_END, side, 0, len(self.round_winners))])
+
+    def _broadcast(self, kind, events):
+        self.sequence += 1
+        for audience, callbacks in self.subscribers.items():
+            if not callbacks:
+                continue
+            data = encode(kind, self.sequence, events, audience)
+            for callback in callbacks:
+                callback(data)
+            self.bytes_sent += len(data) * len(callbacks)
+
+
+class SpectatorView:
+    def __init__(self):
+        """
+        Rebuild match state on the receiving end of a SpectatorFeed.
+        """
+        self.rows = [[0, 0, 0], [0, 0, 0]]
+        self.effects = [[set(), set(), set()], [set(), set(), set()]]
+        self.scores = [0, 0]
+        self.passed = [False, False]
+        self.hand_sizes = [0, 0]
+        self.hands = [None, None]  # Only filled in for audiences that may see them
+        self.round_winners = []
+        self.sequence = None
+
+    def receive(self, data):
+        """
+        Apply an encoded update; usable directly as a subscriber callback.
+        :param data: Encoded bytes from the feed.
+        """
+        kind, sequence, events = decode(data)
+        if kind == KEYFRAME:
+            self.__init__()
+        elif self.sequence is None:
+            return  # Deltas are meaningless before the first keyframe
+        self.sequence = sequence
+        for event_type, side, row, value in events:
+            if event_type == CARD_PLACED:
+                self.rows[side][row] |= 1 << value
+            elif event_type == CARD_REMOVED:
+                self.rows[side][row] &= ~(1 << value)
+            elif event_type == EFFECT_APPLIED:
+                self.effects[side][row].add(EFFECTS[value])
+            elif event_type == EFFECT_CLEARED:
+                self.effects[side][row].discard(EFFECTS[value])
+            elif event_type == SCORE:
+                self.scores[side] = value
+            elif event_type == PASS:
+                self.passed[side] = bool(value)
+            elif event_type == HAND_SIZE:
+                self.hand_sizes[side] = value
+            elif event_type == HAND:
+                self.hands[side] = value
+            elif event_type == ROUND_END:
+                # Keyframes repeat earlier rounds, so place by round number rather than appending
+                del self.round_winners[value - 1:]
+                self.round_winners.append(None if side == TIE else side)